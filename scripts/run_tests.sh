@@ -115,7 +115,7 @@ read -p "Press Enter to continue or Ctrl+C to cancel..."
 
 # 3. Run Unit Tests - Bronze Layer (IBGE Client)
 run_test "Bronze Layer - IBGE API Client" \
-    "$PYTHON -m unittest tests/ingestion/test_ibge_client.py -v"
+    "$PYTHON -m pytest tests/ingestion/test_ibge_client.py -v"
 
 # 4. Run Endpoint Validation - Bronze Layer
 run_test "Bronze Layer - IBGE Metadata Config Validation" \
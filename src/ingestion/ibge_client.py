@@ -4,6 +4,7 @@ import json
 import logging
 import time
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from botocore.exceptions import ClientError
 
@@ -20,17 +21,26 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 class IBGEIngestor:
-    def __init__(self, bucket_name, config_path):
+    DEFAULT_MAX_RETRIES = 10
+    # Datasets fetched at once by run_full_ingestion (config rate_limit.max_concurrent overrides)
+    DEFAULT_MAX_CONCURRENT = 4
+
+    def __init__(self, bucket_name, config_path=None, max_retries=None, config=None):
         """
         Initializes the ingestor for the MBA Thesis Data Lake.
         :param bucket_name: S3 Bucket for the Bronze Layer.
         :param config_path: Path to the ibge_metadata.json file.
+        :param max_retries: HTTP attempts per request (defaults to DEFAULT_MAX_RETRIES).
+        :param config: Already-parsed metadata dict; takes precedence over config_path.
         """
+        if config is None and config_path is None:
+            raise ValueError("Either config_path or config must be provided")
+
         self.s3 = boto3.client('s3')
         self.bucket = bucket_name
-        self.config = self._load_config(config_path)
+        self.config = config if config is not None else self._load_config(config_path)
         self.http_client = HTTPClient(
-            max_retries=10,
+            max_retries=self.DEFAULT_MAX_RETRIES if max_retries is None else max_retries,
             timeout=180,
             user_agent="public-compliance-data-analysis/ibge"
         )
@@ -42,9 +52,20 @@ class IBGEIngestor:
         self.skip_cache = SkipMarkerCache(scope="ibge", ttl_seconds=300)
         self.fast_skip_if_exists = os.getenv("IBGE_FAST_SKIP_IF_EXISTS", "1") == "1"
 
+    @classmethod
+    def from_dict(cls, bucket_name, config, max_retries=None):
+        """
+        Builds an ingestor from an in-memory metadata dict (no config file round-trip).
+        :param bucket_name: S3 Bucket for the Bronze Layer.
+        :param config: Parsed ibge_metadata.json contents.
+        :param max_retries: HTTP attempts per request (defaults to DEFAULT_MAX_RETRIES).
+        """
+        return cls(bucket_name, max_retries=max_retries, config=config)
+
     def _load_config(self, path):
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # json.loads decodes UTF-8 bytes itself, skipping the text-mode reader
+        with open(path, 'rb') as f:
+            return json.loads(f.read())
 
     def _file_is_valid(self, s3_key, local_md5):
         """Check if file exists in S3 and matches MD5 to avoid redundant ingestion."""
@@ -55,6 +76,24 @@ class IBGEIngestor:
         except ClientError:
             return False
 
+    def _prefetch_manifest(self, prefix):
+        """
+        List every object under a prefix once, so per-dataset existence and MD5 checks
+        are local lookups instead of one HeadObject each.
+        :param prefix: S3 key prefix to list (e.g. 'bronze/ibge/').
+        :return: Dict of {s3_key: etag}, or None if the listing failed.
+        """
+        try:
+            paginator = self.s3.get_paginator('list_objects_v2')
+            manifest = {}
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    manifest[obj['Key']] = obj['ETag'].strip('"')
+            return manifest
+        except ClientError as e:
+            logger.warning(f"⚠️ Could not list {prefix}; falling back to per-file checks: {e}")
+            return None
+
     def fetch_with_retry(self, url):
         """Fetches data from SIDRA API using shared HTTP client."""
         return self.http_client.fetch(url, return_json=False)
@@ -69,74 +108,96 @@ class IBGEIngestor:
         """
         Iterates through the 8-entry metadata and performs the raw data dump to S3.
         Covers the 4 pillars (População, Saneamento, Alfabetização, Rendimento) for both 2010 and 2022.
+        Datasets are fetched concurrently, at most max_concurrent at a time, to respect SIDRA rate limits.
         """
         base_url = self.config['api_base_url']
+        manifest = self._prefetch_manifest('bronze/ibge/')
+        datasets = self.config['datasets']
+        if not datasets:
+            return
 
-        for ds in self.config['datasets']:
-            # Metadata extraction
-            table = ds['table_id']
-            # Variables default to 'allxp' if not specified [cite: 2, 4, 9]
-            var = ds.get('variable', 'allxp')
-            # Handle spaces in periods like 'last 1' for 2022 tables [cite: 7]
-            period = str(ds['period']).replace(" ", "%20")
-            classif = ds.get('classifications', '')
-
-            s3_key = f"bronze/ibge/{ds['filename']}"
-
-            # SIDRA URL Structure: /t/<table>/n6/all/v/<var>/p/<period>/<classifications>?formato=json
-            # n6/all ensures we fetch all 5570+ Brazilian municipalities [cite: 2, 6, 8]
-            url = f"{base_url}/t/{table}/n6/all/v/{var}/p/{period}"
-
-            if classif:
-                url += f"/{classif}"
-
-            url += "?formato=json"
-
-            logger.info(f"🚀 Processing {ds['name']}...")
-            logger.info(f"🔗 Source URL: {url}")
-
-            if self.skip_cache.get(s3_key) == "skipped_s3_match":
-                logger.info(f"⏭️ Skipping {ds['name']} - recently skipped (local cache).")
-                continue
-
-            if self.fast_skip_if_exists:
-                if s3_object_exists(self.s3, self.bucket, s3_key):
-                    logger.info(f"⏭️ Skipping {ds['name']} - already exists in S3 (fast skip).")
-                    self.skip_cache.set(s3_key, "skipped_s3_match")
-                    continue
-
-            content_text = self.fetch_with_retry(url)
-
-            if content_text:
-                # Basic JSON validation to ensure we didn't get an empty response or HTML error page
-                try:
-                    data_check = json.loads(content_text)
-                    if len(data_check) < 2:
-                        logger.warning(f"⚠️ {ds['name']} returned only headers. Verify table parameters.")
-                except json.JSONDecodeError:
-                    logger.error(f"❌ Invalid JSON received for {ds['name']}. Skipping.")
-                    continue
-
-                local_md5 = calculate_md5(content_text)
-
-                if self._file_is_valid(s3_key, local_md5):
-                    logger.info(f"⏭️ Skipping {ds['name']} - already matches S3 version.")
-                    self.skip_cache.set(s3_key, "skipped_s3_match")
-                    continue
-
-                try:
-                    self.s3.put_object(
-                        Bucket=self.bucket,
-                        Key=s3_key,
-                        Body=content_text.encode('utf-8'),
-                        ContentType='application/json; charset=utf-8'
-                    )
-                    logger.info(f"✅ Landed in Bronze: {s3_key}")
-                    self.log_source(ds['name'], url)
-                except Exception as e:
-                    logger.error(f"❌ Failed to upload {ds['name']} to S3: {e}")
+        max_concurrent = self.config.get('rate_limit', {}).get('max_concurrent', self.DEFAULT_MAX_CONCURRENT)
+        # Each dataset is one long SIDRA download; overlap them instead of summing their latencies
+        with ThreadPoolExecutor(max_workers=min(max_concurrent, len(datasets))) as executor:
+            list(executor.map(lambda ds: self._ingest_dataset(ds, base_url, manifest), datasets))
+
+    def _ingest_dataset(self, ds, base_url, manifest):
+        """
+        Fetches one dataset and lands it in Bronze unless S3 already holds the same content.
+        :param ds: Dataset entry from ibge_metadata.json.
+        :param base_url: SIDRA API base URL.
+        :param manifest: {s3_key: md5} from _prefetch_manifest, or None to check S3 per key.
+        """
+        # Metadata extraction
+        table = ds['table_id']
+        # Variables default to 'allxp' if not specified [cite: 2, 4, 9]
+        var = ds.get('variable', 'allxp')
+        # Handle spaces in periods like 'last 1' for 2022 tables [cite: 7]
+        period = str(ds['period']).replace(" ", "%20")
+        classif = ds.get('classifications', '')
+
+        s3_key = f"bronze/ibge/{ds['filename']}"
+
+        # SIDRA URL Structure: /t/<table>/n6/all/v/<var>/p/<period>/<classifications>?formato=json
+        # n6/all ensures we fetch all 5570+ Brazilian municipalities [cite: 2, 6, 8]
+        url = f"{base_url}/t/{table}/n6/all/v/{var}/p/{period}"
+
+        if classif:
+            url += f"/{classif}"
+
+        url += "?formato=json"
+
+        logger.info(f"🚀 Processing {ds['name']}...")
+        logger.info(f"🔗 Source URL: {url}")
+
+        if self.skip_cache.get(s3_key) == "skipped_s3_match":
+            logger.info(f"⏭️ Skipping {ds['name']} - recently skipped (local cache).")
+            return
+
+        if self.fast_skip_if_exists:
+            exists = s3_key in manifest if manifest is not None else s3_object_exists(self.s3, self.bucket, s3_key)
+            if exists:
+                logger.info(f"⏭️ Skipping {ds['name']} - already exists in S3 (fast skip).")
+                self.skip_cache.set(s3_key, "skipped_s3_match")
+                return
+
+        content_text = self.fetch_with_retry(url)
+
+        if content_text:
+            # Basic JSON validation to ensure we didn't get an empty response or HTML error page
+            try:
+                data_check = json.loads(content_text)
+                if len(data_check) < 2:
+                    logger.warning(f"⚠️ {ds['name']} returned only headers. Verify table parameters.")
+            except json.JSONDecodeError:
+                logger.error(f"❌ Invalid JSON received for {ds['name']}. Skipping.")
+                return
+
+            local_md5 = calculate_md5(content_text)
+
+            if manifest is not None:
+                is_valid = manifest.get(s3_key) == local_md5
             else:
-                logger.error(f"❌ Critical: Fetch failed for {ds['name']} after maximum retries.")
+                is_valid = self._file_is_valid(s3_key, local_md5)
+
+            if is_valid:
+                logger.info(f"⏭️ Skipping {ds['name']} - already matches S3 version.")
+                self.skip_cache.set(s3_key, "skipped_s3_match")
+                return
+
+            try:
+                self.s3.put_object(
+                    Bucket=self.bucket,
+                    Key=s3_key,
+                    Body=content_text.encode('utf-8'),
+                    ContentType='application/json; charset=utf-8'
+                )
+                logger.info(f"✅ Landed in Bronze: {s3_key}")
+                self.log_source(ds['name'], url)
+            except Exception as e:
+                logger.error(f"❌ Failed to upload {ds['name']} to S3: {e}")
+        else:
+            logger.error(f"❌ Critical: Fetch failed for {ds['name']} after maximum retries.")
 
 if __name__ == "__main__":
     # AWS Configuration - Update bucket name as needed
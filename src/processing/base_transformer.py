@@ -5,27 +5,131 @@ This module provides the abstract base class for all Bronze → Silver transform
 Handles S3 I/O, schema validation, and common transformation utilities.
 """
 
+import io
 import os
+import re
 import json
 import logging
 import hashlib
-import tempfile
+import functools
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 from datetime import datetime
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Silver metadata sidecar PUTs run here so transforms don't wait on them; see flush_metadata_writes
+_METADATA_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix='silver-metadata')
+
+# S3 clients shared by every transformer in the process: {(region, endpoint_url, max_pool_connections): client}
+_S3_CLIENT_CACHE: Dict[Tuple[Optional[str], Optional[str], int], Any] = {}
+
+
+def _get_or_create_s3_client(max_pool_connections: int, region_name: Optional[str] = None,
+                             endpoint_url: Optional[str] = None) -> Any:
+    """
+    Return a cached S3 client, building it on first use.
+    
+    Client construction loads botocore's service model and is the bulk of a
+    transformer's init cost; boto3 clients are thread-safe, so one per
+    configuration is shared.
+    
+    :param max_pool_connections: Size of the client's HTTP connection pool
+    :param region_name: AWS region (None = boto3's default resolution)
+    :param endpoint_url: Custom S3 endpoint (None = AWS)
+    :return: boto3 S3 client
+    """
+    cache_key = (region_name, endpoint_url, max_pool_connections)
+    client = _S3_CLIENT_CACHE.get(cache_key)
+    if client is None:
+        client = boto3.client('s3', region_name=region_name, endpoint_url=endpoint_url, config=Config(
+            # Bronze reads, ETag lookups and multipart uploads can overlap; keep them off the 10-socket default
+            max_pool_connections=max_pool_connections,
+            # Adaptive mode backs off client-side when S3 throttles the fan-out
+            retries={'max_attempts': 10, 'mode': 'adaptive'},
+            tcp_keepalive=True
+        ))
+        _S3_CLIENT_CACHE[cache_key] = client
+    return client
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert parsed JSON into read-only mappings and tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@functools.lru_cache(maxsize=8)
+def _load_schema_config(path: str) -> MappingProxyType:
+    """
+    Load the silver schemas configuration, parsed once per path.
+    
+    Every transformer in a run reads the same config file, so the parsed
+    mapping is shared instead of re-parsed per instance. Nested objects are
+    frozen too (dicts as read-only mappings, lists as tuples), so no
+    transformer can change what the others see.
+    
+    :param path: Path to silver_schemas.json config file
+    :return: Read-only view of the parsed config
+    """
+    return _freeze(json.loads(Path(path).read_bytes()))
+
 
 class BaseTransformer(ABC):
     """Abstract base class for Bronze → Silver data transformations."""
 
+    # Concurrent S3 GETs in _read_bronze_files (reads are latency-bound, not CPU-bound)
+    BRONZE_READ_WORKERS = 16
+
+    # Write a data.json sidecar next to each Silver Parquet file (for inspection)
+    EMIT_SILVER_JSON = True
+
+    # zstd level 3 compresses well below snappy's size at similar write speed
+    PARQUET_WRITE_DEFAULTS = {
+        'compression': 'zstd',
+        'compression_level': 3,
+        'row_group_size': 128_000,
+    }
+
+    # Date formats tried, in order, by _parse_date and _to_datetime_series
+    DATE_FORMATS = [
+        '%Y-%m-%d',
+        '%d/%m/%Y',
+        '%Y-%m-%dT%H:%M:%S',
+        '%Y-%m-%dT%H:%M:%S.%f',
+        '%d/%m/%Y %H:%M:%S'
+    ]
+
+    # Shapes of the common DATE_FORMATS that _parse_date handles without strptime
+    _ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)?$')
+    _BR_DATE_RE = re.compile(r'^(\d{2})/(\d{2})/(\d{4})$')
+
+    # Large Parquet outputs upload as parallel 8 MB multipart chunks
+    PARQUET_UPLOAD_CONFIG = TransferConfig(
+        multipart_threshold=8 * 1024 * 1024,
+        multipart_chunksize=8 * 1024 * 1024,
+        max_concurrency=16,
+        use_threads=True,
+    )
+
     def __init__(self, bucket_name: str, schema_config_path: str):
         """
         Initialize the transformer.
@@ -33,41 +137,57 @@ class BaseTransformer(ABC):
         :param bucket_name: S3 bucket name for the data lake.
         :param schema_config_path: Path to silver_schemas.json config file.
         """
-        self.s3 = boto3.client('s3')
+        self.s3 = _get_or_create_s3_client(max_pool_connections=4 * self.BRONZE_READ_WORKERS)
         self.bucket = bucket_name
-        self.schema_config = self._load_schema_config(schema_config_path)
+        self.schema_config = _load_schema_config(schema_config_path)
         
         # State and region mappings from config
         self.state_mapping = self.schema_config.get('state_mapping', {})
         self.region_mapping = self.schema_config.get('region_mapping', {})
+        # Valid 2-digit state prefixes, as an Arrow value set for _extract_municipality_codes
+        self._valid_state_codes = pa.array(list(self.state_mapping), type=pa.string())
         
         # Build reverse lookup: state_code -> region_code
-        self.state_to_region = {}
-        for region_code, region_info in self.region_mapping.items():
-            for state_code in region_info.get('states', []):
-                self.state_to_region[state_code] = region_code
+        self.state_to_region = MappingProxyType({
+            state_code: region_code
+            for region_code, region_info in self.region_mapping.items()
+            for state_code in region_info.get('states', [])
+        })
+        
+        # Bronze ETags already fetched during this run: {s3_key: etag}
+        self._bronze_hash_cache: Dict[str, str] = {}
+        # Prefixes whose ETags were bulk-loaded by _prefetch_bronze_hashes
+        self._listed_prefixes: set = set()
+        # Silver metadata already read or written during this run: {metadata_key: metadata or None}
+        self._silver_metadata_cache: Dict[str, Optional[Dict]] = {}
+        # Metadata PUTs submitted by _save_silver_metadata and not yet flushed: deque of (key, future)
+        self._metadata_executor = _METADATA_EXECUTOR
+        self._pending_metadata_writes: deque = deque()
         
         # Processing log for thesis documentation
         self.processing_log = Path(__file__).parent.parent.parent / "docs" / "processing.log"
         os.makedirs(self.processing_log.parent, exist_ok=True)
 
-    def _load_schema_config(self, path: str) -> Dict:
-        """Load the silver schemas configuration."""
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-
-    def _read_bronze_json(self, s3_key: str) -> Optional[List[Dict]]:
+    def _read_bronze_json(self, s3_key: str, as_arrow: bool = False,
+                          schema: Optional[pa.Schema] = None) -> Optional[Any]:
         """
         Read a JSON file from the Bronze layer in S3.
         
         :param s3_key: S3 key for the bronze file (e.g., 'bronze/ibge/census_2010_pop.json')
-        :return: Parsed JSON data as list of dicts, or None if not found.
+        :param as_arrow: If True, return the records as a pyarrow Table.
+        :param schema: Explicit Arrow schema for as_arrow (keys outside it are ignored).
+        :return: Parsed JSON data as list of dicts (or pa.Table), or None if not found.
         """
         try:
             response = self.s3.get_object(Bucket=self.bucket, Key=s3_key)
-            content = response['Body'].read().decode('utf-8')
-            data = json.loads(content)
+            # json.loads detects UTF-8 in bytes itself; skips a decoded str copy of the body
+            data = json.loads(response['Body'].read())
+            if not isinstance(data, list):
+                logger.warning(f"⚠️ Bronze file {s3_key} has a non-array root - treating it as one record")
+                data = [data]
             logger.info(f"📥 Read {len(data)} records from {s3_key}")
+            if as_arrow:
+                return self._records_to_arrow(data, schema)
             return data
         except ClientError as e:
             if e.response['Error']['Code'] == 'NoSuchKey':
@@ -75,30 +195,100 @@ class BaseTransformer(ABC):
                 return None
             raise
 
-    def _write_silver_parquet(self, df: pd.DataFrame, s3_key: str, partition_cols: Optional[List[str]] = None) -> bool:
+    @staticmethod
+    def _records_to_arrow(data: List[Dict], schema: Optional[pa.Schema] = None) -> pa.Table:
+        """
+        Build an Arrow table from bronze records.
+        
+        :param data: Parsed bronze records.
+        :param schema: Explicit Arrow schema (keys outside it are ignored).
+        :return: pa.Table with one row per record.
+        """
+        try:
+            return pa.Table.from_pylist(data, schema=schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if schema is None:
+                raise
+        # A JSON number in a string field (e.g. a numeric SIDRA 'V') fails the typed build;
+        # stringify such values, as the scalar str()/_safe_int path did
+        columns = {}
+        for field in schema:
+            values = [record.get(field.name) for record in data]
+            if pa.types.is_string(field.type):
+                values = [None if v is None else str(v) for v in values]
+            columns[field.name] = pa.array(values, type=field.type)
+        return pa.table(columns, schema=schema)
+
+    def _read_bronze_files(self, s3_keys: List[str]) -> Iterator[Tuple[str, Optional[List[Dict]]]]:
+        """
+        Read several Bronze JSON files concurrently.
+        
+        Downloads run on a thread pool while the caller processes earlier files.
+        Results are yielded in the order of s3_keys, so outputs stay deterministic.
+        At most BRONZE_READ_WORKERS files are in flight or buffered at once, so
+        peak memory is bounded by that window rather than by the whole list.
+        
+        :param s3_keys: S3 keys for the bronze files.
+        :return: Iterator of (s3_key, parsed data or None).
+        """
+        if not s3_keys:
+            return
+        
+        window = min(self.BRONZE_READ_WORKERS, len(s3_keys))
+        with ThreadPoolExecutor(max_workers=window) as executor:
+            pending = deque()
+            for s3_key in s3_keys:
+                pending.append((s3_key, executor.submit(self._read_bronze_json, s3_key)))
+                if len(pending) >= window:
+                    key, future = pending.popleft()
+                    yield key, future.result()
+            
+            while pending:
+                key, future = pending.popleft()
+                yield key, future.result()
+
+    def _write_silver_parquet(self, df: pd.DataFrame, s3_key: str, partition_cols: Optional[List[str]] = None,
+                              **write_options) -> bool:
         """
         Write a DataFrame to the Silver layer as Parquet.
         
         :param df: DataFrame to write.
         :param s3_key: S3 key for the silver file (e.g., 'silver/fact_population/data.parquet')
-        :param partition_cols: Optional columns to partition by.
+        :param partition_cols: Optional columns to partition by. Each distinct value gets its own
+                               row groups inside the single file, so readers filtering on these
+                               columns can skip whole row groups by their statistics.
+        :param write_options: Extra pyarrow.parquet.write_table options (e.g. write_statistics,
+                              use_byte_stream_split for float columns).
         :return: True if successful, False otherwise.
         """
         try:
-            with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as tmp:
-                tmp_path = tmp.name
+            # Dictionary encoding wins over byte_stream_split, so leave split columns out of it
+            split_cols = write_options.get('use_byte_stream_split') or []
+            if 'use_dictionary' not in write_options:
+                write_options['use_dictionary'] = [c for c in df.columns if c not in split_cols] if split_cols else True
+            for option, default in self.PARQUET_WRITE_DEFAULTS.items():
+                write_options.setdefault(option, default)
             
-            df.to_parquet(tmp_path, index=False, engine='pyarrow')
+            # Serialize straight from Arrow into memory; no temp file round trip
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            row_group_size = write_options.pop('row_group_size')
+            buffer = io.BytesIO()
+            with pq.ParquetWriter(buffer, table.schema, **write_options) as writer:
+                if partition_cols:
+                    groups = df.groupby(partition_cols, observed=True, dropna=False).indices
+                    for indices in groups.values():
+                        writer.write_table(table.take(indices), row_group_size=row_group_size)
+                else:
+                    writer.write_table(table, row_group_size=row_group_size)
             
-            with open(tmp_path, 'rb') as f:
-                self.s3.put_object(
-                    Bucket=self.bucket,
-                    Key=s3_key,
-                    Body=f.read(),
-                    ContentType='application/octet-stream'
-                )
+            # Upload from the buffer itself (no bytes copy); multipart kicks in above the threshold
+            buffer.seek(0)
+            self.s3.upload_fileobj(
+                buffer, self.bucket, s3_key,
+                ExtraArgs={'ContentType': 'application/octet-stream'},
+                Config=self.PARQUET_UPLOAD_CONFIG
+            )
             
-            os.unlink(tmp_path)
             logger.info(f"📤 Wrote {len(df)} records to {s3_key}")
             return True
         except Exception as e:
@@ -137,48 +327,177 @@ class BaseTransformer(ABC):
         
         Metadata tracks:
         - source_files: dict of {bronze_key: md5_hash}
-        - last_updated: timestamp
+        - processed_at: timestamp
         - record_count: number of records in silver output
         
+        The result is memoized per transformer instance, so repeated skip checks
+        for the same output pay a single GetObject.
+        
         :param metadata_key: S3 key for metadata file
         :return: Metadata dict or None if not found
         """
+        if metadata_key in self._silver_metadata_cache:
+            return self._silver_metadata_cache[metadata_key]
+        
         try:
             response = self.s3.get_object(Bucket=self.bucket, Key=metadata_key)
-            return json.loads(response['Body'].read().decode('utf-8'))
+            # json.loads takes the UTF-8 bytes directly (no intermediate str copy)
+            metadata = json.loads(response['Body'].read())
         except ClientError:
-            return None
+            metadata = None
+        
+        self._silver_metadata_cache[metadata_key] = metadata
+        return metadata
     
     def _save_silver_metadata(self, metadata_key: str, metadata: Dict):
         """
         Save silver layer metadata to S3.
         
+        The PUT is submitted to the metadata executor and this returns immediately;
+        call flush_metadata_writes() to wait for it. The in-run cache is updated
+        right away, so later skip checks see the new metadata.
+        
         :param metadata_key: S3 key for metadata file
         :param metadata: Metadata dict to save
         """
+        # Compact output keeps json on its C encoder (indent falls back to pure Python)
+        body = json.dumps(metadata, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._silver_metadata_cache[metadata_key] = metadata
+        future = self._metadata_executor.submit(self._put_silver_metadata, metadata_key, body)
+        self._pending_metadata_writes.append((metadata_key, future))
+    
+    def _put_silver_metadata(self, metadata_key: str, body: bytes):
+        """
+        Upload an encoded metadata sidecar (runs on the metadata executor).
+        
+        :param metadata_key: S3 key for metadata file
+        :param body: UTF-8 encoded metadata JSON
+        """
         self.s3.put_object(
             Bucket=self.bucket,
             Key=metadata_key,
-            Body=json.dumps(metadata, ensure_ascii=False, indent=2).encode('utf-8'),
+            Body=body,
             ContentType='application/json; charset=utf-8'
         )
         logger.info(f"💾 Saved silver metadata: {metadata_key}")
     
+    def flush_metadata_writes(self) -> bool:
+        """
+        Wait for every pending metadata PUT submitted by this transformer.
+        
+        :return: True if all writes succeeded, False otherwise.
+        """
+        success = True
+        while self._pending_metadata_writes:
+            metadata_key, future = self._pending_metadata_writes.popleft()
+            try:
+                future.result()
+            except Exception as e:
+                # Drop the cached copy so this run doesn't trust metadata that never reached S3
+                self._silver_metadata_cache.pop(metadata_key, None)
+                logger.error(f"❌ Failed to save silver metadata {metadata_key}: {e}")
+                success = False
+        return success
+    
+    def _build_metadata(self, output_key: str, source_keys: List[str], record_count: int,
+                        **extra) -> Dict:
+        """
+        Build the smart-caching metadata dict for a written output.
+        
+        :param output_key: S3 key of the written output file
+        :param source_keys: S3 keys the output was built from (missing files are omitted)
+        :param record_count: Number of records written
+        :param extra: Additional fields to store (e.g. files_processed)
+        :return: Metadata dict for _save_silver_metadata
+        """
+        hashes = self._get_bronze_file_hashes(source_keys)
+        source_files = {s3_key: file_hash for s3_key, file_hash in hashes.items() if file_hash}
+        
+        return {
+            'output_file': output_key,
+            'source_files': source_files,
+            'record_count': record_count,
+            'processed_at': datetime.now().isoformat(timespec='seconds'),
+            **extra
+        }
+    
+    @staticmethod
+    def _strip_etag(etag: str) -> str:
+        """Drop the double quotes S3 wraps around ETag values."""
+        # S3 always quotes the whole value, so a slice beats scanning both ends with strip
+        return etag[1:-1] if etag.startswith('"') else etag
+    
     def _get_bronze_file_hash(self, s3_key: str) -> Optional[str]:
         """
         Get MD5 hash of a bronze file from S3 ETag.
         
+        The ETag is memoized per transformer instance, so the skip check and
+        the metadata save of the same run cost a single HeadObject per file.
+        
         :param s3_key: S3 key for bronze file
         :return: MD5 hash or None if file doesn't exist
         """
+        if s3_key in self._bronze_hash_cache:
+            return self._bronze_hash_cache[s3_key]
+        
         try:
             response = self.s3.head_object(Bucket=self.bucket, Key=s3_key)
             # ETag is MD5 hash for single-part uploads
-            etag = response['ETag'].strip('"')
+            etag = self._strip_etag(response['ETag'])
+            self._bronze_hash_cache[s3_key] = etag
             return etag
         except ClientError:
             return None
     
+    def _prefetch_bronze_hashes(self, prefix: str):
+        """
+        Cache the ETag of every object under a prefix with one paginated listing.
+        
+        ListObjectsV2 returns each ETag alongside its key, so one listing replaces
+        a HeadObject per file. Keys the listing does not cover fall back to HeadObject.
+        
+        :param prefix: S3 key prefix to list (e.g. 'bronze/ibge/')
+        """
+        if prefix in self._listed_prefixes:
+            return
+        self._listed_prefixes.add(prefix)
+        
+        try:
+            paginator = self.s3.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    if obj.get('ETag'):
+                        self._bronze_hash_cache[obj['Key']] = self._strip_etag(obj['ETag'])
+        except ClientError as e:
+            logger.warning(f"⚠️ Could not list {prefix}; falling back to per-file HeadObject: {e}")
+    
+    def _get_bronze_file_hashes(self, s3_keys: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get MD5 hashes for several bronze files.
+        
+        Uncached keys are first looked up with one listing of their common prefix;
+        any still unknown are fetched with concurrent HeadObject calls.
+        
+        :param s3_keys: S3 keys for bronze files
+        :return: Dict of {s3_key: hash or None if the file doesn't exist}
+        """
+        missing = [key for key in dict.fromkeys(s3_keys) if key not in self._bronze_hash_cache]
+        
+        if len(missing) > 1:
+            # One listing of the shared prefix usually covers every key
+            prefix = os.path.commonpath(missing)
+            if prefix:
+                self._prefetch_bronze_hashes(prefix + '/')
+        
+        hashes = {key: self._bronze_hash_cache[key] for key in s3_keys if key in self._bronze_hash_cache}
+        missing = [key for key in missing if key not in hashes]
+        
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.BRONZE_READ_WORKERS, len(missing))) as executor:
+                hashes.update(zip(missing, executor.map(self._get_bronze_file_hash, missing)))
+        
+        return hashes
+    
     def _check_sources_changed(self, metadata_key: str, source_keys: List[str]) -> tuple[bool, List[str]]:
         """
         Check if any source files have changed since last processing.
@@ -194,26 +513,19 @@ class BaseTransformer(ABC):
             return True, source_keys
         
         tracked_sources = existing_metadata.get('source_files', {})
-        changed_files = []
+        # ETags for all sources are fetched concurrently (see _get_bronze_file_hashes)
+        current_hashes = self._get_bronze_file_hashes(source_keys)
         
-        for s3_key in source_keys:
-            current_hash = self._get_bronze_file_hash(s3_key)
-            
-            if not current_hash:
-                # File doesn't exist, skip it
-                continue
-            
-            tracked_hash = tracked_sources.get(s3_key)
-            
-            if tracked_hash != current_hash:
-                # File is new or changed
-                changed_files.append(s3_key)
+        # Fast path: one C-level dict comparison settles the common unchanged case
+        present_hashes = {s3_key: file_hash for s3_key, file_hash in current_hashes.items() if file_hash}
+        if present_hashes == tracked_sources:
+            return False, []
         
-        # Also check for new files not in tracked sources
-        for s3_key in source_keys:
-            if s3_key not in tracked_sources and self._get_bronze_file_hash(s3_key):
-                if s3_key not in changed_files:
-                    changed_files.append(s3_key)
+        # Missing files are ignored; untracked files count as changed (their tracked hash is None)
+        changed_files = [
+            s3_key for s3_key in dict.fromkeys(source_keys)
+            if current_hashes[s3_key] and tracked_sources.get(s3_key) != current_hashes[s3_key]
+        ]
         
         has_changes = len(changed_files) > 0
         return has_changes, changed_files
@@ -285,6 +597,21 @@ class BaseTransformer(ABC):
         
         return code_str
 
+    def _extract_municipality_codes(self, raw_codes: pa.Array) -> pa.Array:
+        """
+        Vectorized version of _extract_municipality_code over an Arrow array.
+        
+        :param raw_codes: Arrow array (or chunked array) of raw code values.
+        :return: String array with 7-digit codes, null where invalid.
+        """
+        codes = pc.utf8_trim_whitespace(pc.cast(raw_codes, pa.string()))
+        codes = pc.replace_substring_regex(codes, pattern=r'\..*$', replacement='')
+        
+        valid = pc.and_(pc.equal(pc.utf8_length(codes), 7), pc.utf8_is_digit(codes))
+        valid = pc.and_(valid, pc.is_in(pc.utf8_slice_codeunits(codes, 0, 2), value_set=self._valid_state_codes))
+        
+        return pc.if_else(valid, codes, pa.scalar(None, type=pa.string()))
+
     def _extract_state_code(self, municipality_code: str) -> str:
         """Extract 2-digit state code from municipality code."""
         return municipality_code[:2] if municipality_code else None
@@ -325,6 +652,43 @@ class BaseTransformer(ABC):
         except (ValueError, TypeError):
             return None
 
+    def _to_numeric_series(self, values: Any, integer: bool = False) -> pd.Series:
+        """
+        Vectorized counterpart of _safe_int/_safe_float.
+
+        :param values: Series or array-like of raw values.
+        :param integer: If True, treat commas as thousands separators and truncate
+                        like _safe_int; otherwise treat commas as decimal points.
+        :return: float64 Series with NaN for invalid values.
+        """
+        text = pd.Series(values, dtype='string').str.replace(' ', '', regex=False).str.strip()
+        text = text.str.replace(',', '' if integer else '.', regex=False)
+        numeric = pd.to_numeric(text, errors='coerce').astype('float64')
+        return np.trunc(numeric) if integer else numeric
+
+    def _to_datetime_series(self, values: Any, formats: List[str] = None) -> pd.Series:
+        """
+        Vectorized counterpart of _parse_date.
+        
+        Each format is tried in order, over whole columns, on the values still unparsed.
+        
+        :param values: Series or array-like of raw date values.
+        :param formats: List of date formats to try (defaults to DATE_FORMATS).
+        :return: datetime64 Series with NaT for missing or unparseable values.
+        """
+        text = pd.Series(values, dtype='string').str.strip()
+        parsed = pd.Series(pd.NaT, index=text.index, dtype='datetime64[us]')
+        
+        for fmt in formats or self.DATE_FORMATS:
+            pending = parsed.isna() & text.notna() & text.ne('')
+            if not pending.any():
+                break
+            converted = pd.to_datetime(text[pending], format=fmt, errors='coerce')
+            # pandas accepts a signed %Y ('-2020-01-15'); strptime, and so _parse_date, does not
+            parsed[pending] = converted.mask(converted.dt.year < 1)
+        
+        return parsed
+
     def _parse_date(self, date_str: Any, formats: List[str] = None) -> Optional[datetime]:
         """
         Parse a date string into datetime object.
@@ -336,17 +700,22 @@ class BaseTransformer(ABC):
         if date_str is None or date_str == '':
             return None
         
-        if formats is None:
-            formats = [
-                '%Y-%m-%d',
-                '%d/%m/%Y',
-                '%Y-%m-%dT%H:%M:%S',
-                '%Y-%m-%dT%H:%M:%S.%f',
-                '%d/%m/%Y %H:%M:%S'
-            ]
-        
         date_str = str(date_str).strip()
         
+        if formats is None:
+            formats = self.DATE_FORMATS
+            # Fast paths for the ISO and dd/mm/yyyy shapes; anything else (or an
+            # impossible date) falls through to the strptime loop
+            try:
+                if self._ISO_DATE_RE.match(date_str):
+                    return datetime.fromisoformat(date_str)
+                match = self._BR_DATE_RE.match(date_str)
+                if match:
+                    day, month, year = match.groups()
+                    return datetime(int(year), int(month), int(day))
+            except ValueError:
+                pass
+        
         for fmt in formats:
             try:
                 return datetime.strptime(date_str, fmt)
@@ -420,7 +789,13 @@ class BaseTransformer(ABC):
                 elif col_type == 'date':
                     df[col_name] = pd.to_datetime(df[col_name], errors='coerce')
                 elif col_type == 'string':
+                    # pandas' default string dtype on purpose ('str' on pandas 3, object on 2.2):
+                    # Parquet stores it as UTF-8 either way, and an NA-semantics dtype would
+                    # change comparisons and missing values in the Gold merges
                     df[col_name] = df[col_name].astype(str).replace('nan', None).replace('None', None)
+                    # Low-cardinality text (states, regions, registries) stores as int codes
+                    if columns[col_name].get('categorical'):
+                        df[col_name] = df[col_name].astype('category')
             except Exception as e:
                 logger.warning(f"⚠️ Type conversion failed for {col_name}: {e}")
         
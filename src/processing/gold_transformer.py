@@ -16,7 +16,6 @@ Features:
 import logging
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-from datetime import datetime
 
 import pandas as pd
 import numpy as np
@@ -66,6 +65,10 @@ class GoldTransformer(BaseTransformer):
         if not self._transform_analysis_compliance():
             success = False
         
+        # Metadata sidecars are written in the background; wait for them before reporting
+        if not self.flush_metadata_writes():
+            success = False
+        
         if success:
             logger.info("✅ Gold layer transformation complete!")
         else:
@@ -266,17 +269,7 @@ class GoldTransformer(BaseTransformer):
         
         # Save metadata
         if success:
-            source_file_hashes = {}
-            for s3_key in source_keys:
-                file_hash = self._get_bronze_file_hash(s3_key)
-                if file_hash:
-                    source_file_hashes[s3_key] = file_hash
-            
-            metadata = {
-                'source_files': source_file_hashes,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'record_count': len(result)
-            }
+            metadata = self._build_metadata(output_key, source_keys, len(result))
             self._save_silver_metadata(metadata_key, metadata)
         
         self.log_processing('gold_municipality_socioeconomic', 'SUCCESS' if success else 'FAILED',
@@ -325,7 +318,7 @@ class GoldTransformer(BaseTransformer):
         states = df_muni[['state_code', 'state_name', 'region_code', 'region_name']].drop_duplicates()
         
         # Count municipalities per state
-        muni_counts = df_muni.groupby('state_code').size().reset_index(name='municipality_count')
+        muni_counts = df_muni.groupby('state_code', observed=True).size().reset_index(name='municipality_count')
         states = states.merge(muni_counts, on='state_code', how='left')
         
         # Aggregate population by state
@@ -338,13 +331,13 @@ class GoldTransformer(BaseTransformer):
             )
             
             # Population 2022
-            pop_2022 = pop_with_state[pop_with_state['year'] == 2022].groupby('state_code').agg(
+            pop_2022 = pop_with_state[pop_with_state['year'] == 2022].groupby('state_code', observed=True).agg(
                 total_population_2022=('total_population', 'sum')
             ).reset_index()
             states = states.merge(pop_2022, on='state_code', how='left')
             
             # Population 2010
-            pop_2010 = pop_with_state[pop_with_state['year'] == 2010].groupby('state_code').agg(
+            pop_2010 = pop_with_state[pop_with_state['year'] == 2010].groupby('state_code', observed=True).agg(
                 total_population_2010=('total_population', 'sum')
             ).reset_index()
             states = states.merge(pop_2010, on='state_code', how='left')
@@ -366,7 +359,7 @@ class GoldTransformer(BaseTransformer):
                 how='left'
             )
             
-            inc_2022 = inc_with_state[inc_with_state['year'] == 2022].groupby('state_code').agg(
+            inc_2022 = inc_with_state[inc_with_state['year'] == 2022].groupby('state_code', observed=True).agg(
                 avg_income_2022=('avg_income', 'mean')
             ).reset_index()
             inc_2022['avg_income_2022'] = inc_2022['avg_income_2022'].round(2)
@@ -374,10 +367,15 @@ class GoldTransformer(BaseTransformer):
         
         # Count sanctions by state
         if df_sanctions is not None:
-            sanctions_by_state = df_sanctions[df_sanctions['state_code'].notna()].groupby('state_code').agg(
+            located = df_sanctions[df_sanctions['state_code'].notna()]
+            # int8 dummies let the counts use the built-in sum instead of a per-group lambda
+            sanctions_by_state = located.assign(
+                is_pf=located['entity_type'].eq('PF').astype('int8'),
+                is_pj=located['entity_type'].eq('PJ').astype('int8')
+            ).groupby('state_code', observed=True).agg(
                 total_sanctions=('sanction_id', 'nunique'),
-                sanctions_pf=('entity_type', lambda x: (x == 'PF').sum()),
-                sanctions_pj=('entity_type', lambda x: (x == 'PJ').sum())
+                sanctions_pf=('is_pf', 'sum'),
+                sanctions_pj=('is_pj', 'sum')
             ).reset_index()
             states = states.merge(sanctions_by_state, on='state_code', how='left')
             
@@ -406,17 +404,7 @@ class GoldTransformer(BaseTransformer):
         
         # Save metadata
         if success:
-            source_file_hashes = {}
-            for s3_key in source_keys:
-                file_hash = self._get_bronze_file_hash(s3_key)
-                if file_hash:
-                    source_file_hashes[s3_key] = file_hash
-            
-            metadata = {
-                'source_files': source_file_hashes,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'record_count': len(states)
-            }
+            metadata = self._build_metadata(output_key, source_keys, len(states))
             self._save_silver_metadata(metadata_key, metadata)
         
         self.log_processing('gold_state_summary', 'SUCCESS' if success else 'FAILED',
@@ -451,10 +439,13 @@ class GoldTransformer(BaseTransformer):
             return False
         
         # Aggregate by registry type
-        registry_summary = df_sanctions.groupby('registry_type').agg(
+        registry_summary = df_sanctions.assign(
+            is_pf=df_sanctions['entity_type'].eq('PF').astype('int8'),
+            is_pj=df_sanctions['entity_type'].eq('PJ').astype('int8')
+        ).groupby('registry_type', observed=True).agg(
             total_sanctions=('sanction_id', 'nunique'),
-            sanctions_pf=('entity_type', lambda x: (x == 'PF').sum()),
-            sanctions_pj=('entity_type', lambda x: (x == 'PJ').sum()),
+            sanctions_pf=('is_pf', 'sum'),
+            sanctions_pj=('is_pj', 'sum'),
             unique_agencies=('sanctioning_agency', 'nunique'),
             earliest_sanction=('sanction_start_date', 'min'),
             latest_sanction=('sanction_start_date', 'max')
@@ -469,7 +460,7 @@ class GoldTransformer(BaseTransformer):
         
         # Add state breakdown as nested structure (for JSON output)
         state_breakdown = df_sanctions[df_sanctions['state_code'].notna()].groupby(
-            ['registry_type', 'state_code']
+            ['registry_type', 'state_code'], observed=True
         ).agg(
             count=('sanction_id', 'nunique')
         ).reset_index()
@@ -496,17 +487,7 @@ class GoldTransformer(BaseTransformer):
         
         # Save metadata
         if success:
-            source_file_hashes = {}
-            for s3_key in source_keys:
-                file_hash = self._get_bronze_file_hash(s3_key)
-                if file_hash:
-                    source_file_hashes[s3_key] = file_hash
-            
-            metadata = {
-                'source_files': source_file_hashes,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'record_count': len(result)
-            }
+            metadata = self._build_metadata(output_key, source_keys, len(result))
             self._save_silver_metadata(metadata_key, metadata)
         
         self.log_processing('gold_sanctions_summary', 'SUCCESS' if success else 'FAILED',
@@ -558,7 +539,7 @@ class GoldTransformer(BaseTransformer):
         states = df_muni[['state_code', 'state_name', 'region_code', 'region_name']].drop_duplicates()
         
         # Count municipalities
-        muni_counts = df_muni.groupby('state_code').size().reset_index(name='n_municipalities')
+        muni_counts = df_muni.groupby('state_code', observed=True).size().reset_index(name='n_municipalities')
         states = states.merge(muni_counts, on='state_code', how='left')
         
         # Population 2022
@@ -568,7 +549,7 @@ class GoldTransformer(BaseTransformer):
                 on='municipality_code', 
                 how='left'
             )
-            pop_2022 = pop_with_state[pop_with_state['year'] == 2022].groupby('state_code').agg(
+            pop_2022 = pop_with_state[pop_with_state['year'] == 2022].groupby('state_code', observed=True).agg(
                 population=('total_population', 'sum')
             ).reset_index()
             states = states.merge(pop_2022, on='state_code', how='left')
@@ -580,7 +561,7 @@ class GoldTransformer(BaseTransformer):
                 on='municipality_code', 
                 how='left'
             )
-            lit_2022 = lit_with_state[lit_with_state['year'] == 2022].groupby('state_code').agg(
+            lit_2022 = lit_with_state[lit_with_state['year'] == 2022].groupby('state_code', observed=True).agg(
                 avg_literacy_rate=('literacy_rate', 'mean')
             ).reset_index()
             lit_2022['avg_literacy_rate'] = lit_2022['avg_literacy_rate'].round(2)
@@ -593,7 +574,7 @@ class GoldTransformer(BaseTransformer):
                 on='municipality_code', 
                 how='left'
             )
-            inc_2022 = inc_with_state[inc_with_state['year'] == 2022].groupby('state_code').agg(
+            inc_2022 = inc_with_state[inc_with_state['year'] == 2022].groupby('state_code', observed=True).agg(
                 avg_income=('avg_income', 'mean')
             ).reset_index()
             inc_2022['avg_income'] = inc_2022['avg_income'].round(2)
@@ -601,12 +582,12 @@ class GoldTransformer(BaseTransformer):
         
         # Sanctions counts
         if df_sanctions is not None and len(df_sanctions) > 0:
-            sanctions_by_state = df_sanctions[df_sanctions['state_code'].notna()].groupby('state_code').agg(
+            located = df_sanctions[df_sanctions['state_code'].notna()]
+            registries = ['CEIS', 'CNEP', 'CEAF', 'CEPIM']
+            dummies = {f'is_{r.lower()}': located['registry_type'].eq(r).astype('int8') for r in registries}
+            sanctions_by_state = located.assign(**dummies).groupby('state_code', observed=True).agg(
                 n_sanctions=('sanction_id', 'nunique'),
-                n_sanctions_ceis=('registry_type', lambda x: (x == 'CEIS').sum()),
-                n_sanctions_cnep=('registry_type', lambda x: (x == 'CNEP').sum()),
-                n_sanctions_ceaf=('registry_type', lambda x: (x == 'CEAF').sum()),
-                n_sanctions_cepim=('registry_type', lambda x: (x == 'CEPIM').sum())
+                **{f'n_sanctions_{r.lower()}': (f'is_{r.lower()}', 'sum') for r in registries}
             ).reset_index()
             states = states.merge(sanctions_by_state, on='state_code', how='left')
         
@@ -656,17 +637,7 @@ class GoldTransformer(BaseTransformer):
         
         # Save metadata
         if success:
-            source_file_hashes = {}
-            for s3_key in source_keys:
-                file_hash = self._get_bronze_file_hash(s3_key)
-                if file_hash:
-                    source_file_hashes[s3_key] = file_hash
-            
-            metadata = {
-                'source_files': source_file_hashes,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'record_count': len(states)
-            }
+            metadata = self._build_metadata(output_key, source_keys, len(states))
             self._save_silver_metadata(metadata_key, metadata)
         
         self.log_processing('gold_analysis_compliance', 'SUCCESS' if success else 'FAILED',
@@ -15,6 +15,7 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 
 import pandas as pd
+import pyarrow as pa
 
 from src.processing.base_transformer import BaseTransformer
 
@@ -35,6 +36,83 @@ class IBGETransformer(BaseTransformer):
         'income_2022': 'bronze/ibge/census_2022_income.json',
     }
 
+    # SIDRA /values rows deliver every field as a string
+    SIDRA_SCHEMA = pa.schema([
+        (name, pa.string())
+        for name in ('NC', 'NN', 'MC', 'MN', 'V', 'D1C', 'D1N', 'D2C', 'D2N', 'D3C', 'D3N')
+    ])
+
+    # Output location, caching metadata and provenance for each Silver table. Fact tables
+    # also describe how their SIDRA values are shaped (see _transform_fact):
+    # - value_column: column the SIDRA value becomes ({year: column} when it differs by year)
+    # - extra_columns: nullable columns filled with None
+    # - integer: parse values as counts (see _to_numeric_series)
+    # - count_columns: counts stored as Int32 (municipal counts fit; halves the schema's Int64)
+    # - byte_stream_split: float columns written with byte_stream_split encoding
+    _FACT_SPECS = {
+        'municipalities': {
+            'output_key': 'silver/dim_municipalities/data.parquet',
+            'metadata_key': 'silver/dim_municipalities/_metadata.json',
+            'source_keys': (BRONZE_FILES['pop_2010'], BRONZE_FILES['pop_2022']),
+            'label': 'dim_municipalities',
+        },
+        'population': {
+            'output_key': 'silver/fact_population/data.parquet',
+            'metadata_key': 'silver/fact_population/_metadata.json',
+            'source_keys': (BRONZE_FILES['pop_2010'], BRONZE_FILES['pop_2022']),
+            'label': 'census_population',
+            'value_column': 'total_population',
+            'extra_columns': ('urban_population', 'rural_population'),
+            'integer': True,
+            'count_columns': ('total_population',),
+            'byte_stream_split': (),
+        },
+        'sanitation': {
+            'output_key': 'silver/fact_sanitation/data.parquet',
+            'metadata_key': 'silver/fact_sanitation/_metadata.json',
+            'source_keys': (BRONZE_FILES['sanitation_2010'], BRONZE_FILES['sanitation_2022']),
+            'label': 'census_sanitation',
+            'value_column': 'total_households',
+            'extra_columns': ('households_with_water', 'households_with_sewage',
+                              'households_with_garbage_collection',
+                              'water_coverage_pct', 'sewage_coverage_pct'),
+            'integer': True,
+            'count_columns': ('total_households',),
+            'byte_stream_split': (),
+        },
+        'literacy': {
+            'output_key': 'silver/fact_literacy/data.parquet',
+            'metadata_key': 'silver/fact_literacy/_metadata.json',
+            'source_keys': (BRONZE_FILES['literacy_2010'], BRONZE_FILES['literacy_2022']),
+            'label': 'census_literacy',
+            # Table 3540 (2010) reports population counts; table 9543 (2022) the rate in %
+            'value_column': {2010: 'population_15_plus', 2022: 'literacy_rate'},
+            'extra_columns': ('literate_population',),
+            'integer': False,
+            'count_columns': ('population_15_plus',),
+            'byte_stream_split': ('literacy_rate',),
+        },
+        'income': {
+            'output_key': 'silver/fact_income/data.parquet',
+            'metadata_key': 'silver/fact_income/_metadata.json',
+            'source_keys': (BRONZE_FILES['income_2010'], BRONZE_FILES['income_2022']),
+            'label': 'census_income',
+            # V contains average income in R$
+            'value_column': 'avg_income',
+            'extra_columns': ('median_income', 'population_with_income'),
+            'integer': False,
+            'count_columns': (),
+            'byte_stream_split': ('avg_income', 'median_income'),
+        },
+    }
+
+    def __init__(self, bucket_name: str, schema_config_path: str):
+        super().__init__(bucket_name, schema_config_path)
+        
+        # Parsed SIDRA tables for this run: {bronze_key: pa.Table}. The population
+        # files feed both dim_municipalities and fact_population.
+        self._sidra_tables: Dict[str, pa.Table] = {}
+
     def get_source_datasets(self) -> List[str]:
         """Return list of source dataset names."""
         return list(self.BRONZE_FILES.keys())
@@ -62,6 +140,10 @@ class IBGETransformer(BaseTransformer):
         if not self._transform_income():
             success = False
         
+        # Metadata sidecars are written in the background; wait for them before reporting
+        if not self.flush_metadata_writes():
+            success = False
+        
         if success:
             logger.info("✅ IBGE Silver layer transformation complete!")
         else:
@@ -69,35 +151,26 @@ class IBGETransformer(BaseTransformer):
         
         return success
 
-    def _parse_ibge_json(self, data: List[Dict], year: int) -> pd.DataFrame:
+    def _parse_year_df(self, table: pa.Table, year: int, integer: bool = False) -> pd.DataFrame:
         """
-        Parse IBGE SIDRA API JSON response into DataFrame.
-        
-        SIDRA returns data where:
-        - First row is typically header metadata
-        - Each row has keys like 'D1C', 'D2C', etc. for dimensions
-        - 'V' contains the value
-        - Municipality code is typically in one of the D*C fields
+        Build the per-year DataFrame for a SIDRA table read by _read_sidra_table.
         
-        :param data: Raw JSON data from SIDRA API.
+        :param table: SIDRA table for a single census year.
         :param year: Census year for this data.
-        :return: DataFrame with parsed data.
+        :param integer: Parse values as counts (see _to_numeric_series).
+        :return: DataFrame with municipality_code, year and value for valid rows.
         """
-        if not data or len(data) < 2:
-            logger.warning(f"⚠️ Empty or insufficient IBGE data for year {year}")
-            return pd.DataFrame()
-        
-        # Skip header row (first element contains column metadata)
-        records = data[1:]
-        
-        df = pd.DataFrame(records)
-        df['year'] = year
-        
+        df = pd.DataFrame({
+            'municipality_code': table['municipality_code'].to_pandas(),
+            'value': self._to_numeric_series(table['value'].to_pandas(), integer=integer),
+        })
+        df = df.dropna(subset=['municipality_code', 'value'])
+        df.insert(1, 'year', year)
         return df
 
-    def _extract_sidra_data(self, row: Dict) -> Optional[Dict]:
+    def _read_sidra_table(self, bronze_key: str) -> Optional[pa.Table]:
         """
-        Extract data from a SIDRA API row.
+        Read a SIDRA API bronze file into an Arrow table.
         
         SIDRA format for n6/all (municipality level) queries:
         - D1C: Municipality Code (always 7 digits)
@@ -109,22 +182,29 @@ class IBGETransformer(BaseTransformer):
         - V: Value
         - MN: Unit of measurement
         
-        :param row: A single data row from SIDRA response.
-        :return: Dict with municipality_code, municipality_name, value, or None.
+        The header row is dropped and municipality codes are validated with
+        Arrow compute kernels instead of per-row Python calls. Tables are
+        memoized per bronze key, so a file is downloaded and parsed once per run.
+        
+        :param bronze_key: S3 key for the bronze file.
+        :return: Table with municipality_code (null if invalid), municipality_name
+                 and raw value columns, or None if the file is missing/empty.
         """
-        muni_code = self._extract_municipality_code(row.get('D1C'))
-        if not muni_code:
+        if bronze_key in self._sidra_tables:
+            return self._sidra_tables[bronze_key]
+        
+        table = self._read_bronze_json(bronze_key, as_arrow=True, schema=self.SIDRA_SCHEMA)
+        if table is None or table.num_rows == 0:
             return None
         
-        return {
-            'municipality_code': muni_code,
-            'municipality_name': row.get('D1N', ''),
-            'value': row.get('V'),
-            'variable_code': row.get('D2C'),
-            'variable_name': row.get('D2N'),
-            'year': row.get('D3N') or row.get('D3C'),
-            'unit': row.get('MN')
-        }
+        table = table.slice(1)  # Skip header
+        table = pa.table({
+            'municipality_code': self._extract_municipality_codes(table['D1C']),
+            'municipality_name': table['D1N'],
+            'value': table['V'],
+        })
+        self._sidra_tables[bronze_key] = table
+        return table
 
     def _transform_municipalities(self) -> bool:
         """
@@ -134,11 +214,11 @@ class IBGETransformer(BaseTransformer):
         """
         logger.info("📊 Building municipalities dimension table...")
         
-        # Check if we can skip processing
-        output_key = 'silver/dim_municipalities/data.parquet'
-        metadata_key = 'silver/dim_municipalities/_metadata.json'
-        source_keys = [self.BRONZE_FILES['pop_2010'], self.BRONZE_FILES['pop_2022']]
+        spec = self._FACT_SPECS['municipalities']
+        output_key, metadata_key, label = spec['output_key'], spec['metadata_key'], spec['label']
+        source_keys = list(spec['source_keys'])
         
+        # Check if we can skip processing
         should_skip, reason = self._should_skip_processing(output_key, metadata_key, source_keys)
         if should_skip:
             logger.info(f"⏭️  Skipping municipalities dimension: {reason}")
@@ -150,16 +230,14 @@ class IBGETransformer(BaseTransformer):
         for year in [2010, 2022]:
             key = f'pop_{year}'
             bronze_key = self.BRONZE_FILES[key]
-            data = self._read_bronze_json(bronze_key)
+            table = self._read_sidra_table(bronze_key)
             
-            if not data:
+            if table is None:
                 continue
             
-            for row in data[1:]:  # Skip header
-                parsed = self._extract_sidra_data(row)
-                if parsed and parsed['municipality_code'] not in municipalities:
-                    muni_code = parsed['municipality_code']
-                    muni_name = parsed['municipality_name']
+            for muni_code, muni_name in zip(table['municipality_code'].to_pylist(),
+                                            table['municipality_name'].to_pylist()):
+                if muni_code and muni_code not in municipalities:
                     state_code = self._extract_state_code(muni_code)
                     region_code = self._get_region_code(state_code)
                     
@@ -174,379 +252,142 @@ class IBGETransformer(BaseTransformer):
         
         if not municipalities:
             logger.error("❌ No municipalities extracted from IBGE data")
-            self.log_processing('dim_municipalities', 'FAILED', 0, 0, 
-                              list(self.BRONZE_FILES.values()), 'silver/dim_municipalities/data.parquet',
+            self.log_processing(label, 'FAILED', 0, 0, source_keys, output_key,
                               'No municipalities found')
             return False
         
         df = pd.DataFrame(list(municipalities.values()))
+        # Geography columns come back categorical (see silver_schemas.json)
         df = self.validate_schema(df, 'municipalities')
         
         # Sort by code for consistency
-        df = df.sort_values('municipality_code').reset_index(drop=True)
+        df = df.sort_values('municipality_code')
         
-        success = self._write_silver_parquet(df, output_key)
+        success = self._write_silver_parquet(df, output_key, write_statistics=['municipality_code'])
         
         # Also write JSON for easier inspection
-        self._write_silver_json(df, output_key.replace('.parquet', '.json'))
+        if self.EMIT_SILVER_JSON:
+            self._write_silver_json(df, output_key.replace('.parquet', '.json'))
         
         # Save metadata for smart caching
         if success:
-            metadata = {
-                'output_file': output_key,
-                'source_files': {key: self._get_bronze_file_hash(key) for key in source_keys},
-                'record_count': len(df),
-                'processed_at': pd.Timestamp.now().isoformat()
-            }
+            metadata = self._build_metadata(output_key, source_keys, len(df))
             self._save_silver_metadata(metadata_key, metadata)
         
-        self.log_processing('dim_municipalities', 'SUCCESS' if success else 'FAILED',
-                          0, len(df), list(self.BRONZE_FILES.values()), output_key)
+        self.log_processing(label, 'SUCCESS' if success else 'FAILED',
+                          0, len(df), source_keys, output_key)
         
         logger.info(f"✅ Municipalities dimension: {len(df)} municipalities")
         return success
 
-    def _transform_population(self) -> bool:
+    def _transform_fact(self, name: str) -> bool:
         """
-        Transform population data from Census 2010 and 2022.
+        Transform one census fact table from its 2010 and 2022 SIDRA files.
         
-        Output: silver/fact_population/data.parquet
+        Every table keeps one record per municipality and year; the per-table
+        shape comes from _FACT_SPECS[name].
+        
+        :param name: Fact table name in _FACT_SPECS (e.g. 'population').
+        :return: True if successful (or skipped), False otherwise.
         """
-        logger.info("📊 Transforming population data...")
+        title = name.capitalize()
+        logger.info(f"📊 Transforming {name} data...")
         
-        # Check if we can skip processing
-        output_key = 'silver/fact_population/data.parquet'
-        metadata_key = 'silver/fact_population/_metadata.json'
-        source_keys = [self.BRONZE_FILES['pop_2010'], self.BRONZE_FILES['pop_2022']]
+        spec = self._FACT_SPECS[name]
+        output_key, metadata_key, label = spec['output_key'], spec['metadata_key'], spec['label']
+        source_keys = list(spec['source_keys'])
         
+        # Check if we can skip processing
         should_skip, reason = self._should_skip_processing(output_key, metadata_key, source_keys)
         if should_skip:
-            logger.info(f"⏭️  Skipping population: {reason}")
+            logger.info(f"⏭️  Skipping {name}: {reason}")
             return True
         
-        all_records = []
-        total_input = 0
+        value_columns = spec['value_column']
+        if isinstance(value_columns, str):
+            value_columns = dict.fromkeys((2010, 2022), value_columns)
         
-        for year in [2010, 2022]:
-            key = f'pop_{year}'
-            bronze_key = self.BRONZE_FILES[key]
+        year_frames = []
+        total_input = 0
+        error = None
+        
+        # source_keys are listed 2010 first, matching value_columns
+        for year, bronze_key in zip(value_columns, source_keys):
+            table = self._read_sidra_table(bronze_key)
+            if table is None:
+                error = f"No {name} data for {year}"
+                break
             
-            data = self._read_bronze_json(bronze_key)
-            if not data:
-                logger.warning(f"⚠️ No population data for {year}")
-                continue
+            total_input += table.num_rows
             
-            total_input += len(data) - 1  # Exclude header
+            # One record per municipality (SIDRA returns one row per municipality)
+            year_df = self._parse_year_df(table, year, integer=spec['integer'])
+            logger.info(f"📊 {title} {year}: {len(year_df)}/{table.num_rows} rows parsed")
+            if year_df.empty:
+                error = f"No {name} records parsed for {year}"
+                break
             
-            # Extract one record per municipality (SIDRA returns one row per municipality)
-            for row in data[1:]:  # Skip header
-                parsed = self._extract_sidra_data(row)
-                if not parsed:
-                    continue
-                
-                value = self._safe_int(parsed['value'])
-                if value is None:
-                    continue
-                
-                all_records.append({
-                    'municipality_code': parsed['municipality_code'],
-                    'year': year,
-                    'total_population': value,
-                    'urban_population': None,
-                    'rural_population': None
-                })
-        
-        if not all_records:
-            logger.error("❌ No population records extracted")
-            self.log_processing('census_population', 'FAILED', total_input, 0,
-                              source_keys, 'silver/fact_population/data.parquet',
-                              'No records extracted')
+            value_column = value_columns[year]
+            year_df = year_df.rename(columns={'value': value_column})
+            if value_column in spec['count_columns']:
+                year_df[value_column] = year_df[value_column].astype('int32')
+            # Other years' value columns are empty for this year
+            placeholders = [c for c in value_columns.values() if c != value_column]
+            placeholders.extend(spec['extra_columns'])
+            year_frames.append(year_df.assign(**dict.fromkeys(placeholders)))
+        
+        # A census year that is missing or unparseable stops the loop early
+        if error:
+            logger.error(f"❌ {error}")
+            self.log_processing(label, 'FAILED', total_input, 0,
+                              source_keys, output_key, error)
             return False
         
-        df = pd.DataFrame(all_records)
-        df = self.validate_schema(df, 'census_population')
+        df = pd.concat(year_frames, ignore_index=True)
+        
+        df = self.validate_schema(df, label)
+        df['municipality_code'] = df['municipality_code'].astype('category')
+        for column in spec['count_columns']:
+            df[column] = df[column].astype('Int32')
         
         # Remove duplicates (keep first occurrence)
         df = df.drop_duplicates(subset=['municipality_code', 'year'], keep='first')
-        df = df.sort_values(['municipality_code', 'year']).reset_index(drop=True)
+        # Sorted input gives tight per-row-group min/max stats for predicate pushdown
+        df = df.sort_values(['municipality_code', 'year'])
         
-        success = self._write_silver_parquet(df, output_key)
-        self._write_silver_json(df, output_key.replace('.parquet', '.json'))
+        write_options = {'write_statistics': ['municipality_code', 'year']}
+        if spec['byte_stream_split']:
+            write_options['use_byte_stream_split'] = list(spec['byte_stream_split'])
+        success = self._write_silver_parquet(df, output_key, **write_options)
+        if self.EMIT_SILVER_JSON:
+            self._write_silver_json(df, output_key.replace('.parquet', '.json'))
         
         # Save metadata for smart caching
         if success:
-            metadata = {
-                'output_file': output_key,
-                'source_files': {key: self._get_bronze_file_hash(key) for key in source_keys},
-                'record_count': len(df),
-                'processed_at': pd.Timestamp.now().isoformat()
-            }
+            metadata = self._build_metadata(output_key, source_keys, len(df))
             self._save_silver_metadata(metadata_key, metadata)
         
-        self.log_processing('census_population', 'SUCCESS' if success else 'FAILED',
+        self.log_processing(label, 'SUCCESS' if success else 'FAILED',
                           total_input, len(df), source_keys, output_key)
         
-        logger.info(f"✅ Population: {len(df)} records ({df['year'].nunique()} years)")
+        logger.info(f"✅ {title}: {len(df)} records ({df['year'].nunique()} years)")
         return success
 
+    def _transform_population(self) -> bool:
+        """Transform population data. Output: silver/fact_population/data.parquet"""
+        return self._transform_fact('population')
+
     def _transform_sanitation(self) -> bool:
-        """
-        Transform sanitation data from Census 2010 and 2022.
-        
-        Output: silver/fact_sanitation/data.parquet
-        """
-        logger.info("📊 Transforming sanitation data...")
-        
-        # Check if we can skip processing
-        output_key = 'silver/fact_sanitation/data.parquet'
-        metadata_key = 'silver/fact_sanitation/_metadata.json'
-        source_keys = [self.BRONZE_FILES['sanitation_2010'], self.BRONZE_FILES['sanitation_2022']]
-        
-        should_skip, reason = self._should_skip_processing(output_key, metadata_key, source_keys)
-        if should_skip:
-            logger.info(f"⏭️  Skipping sanitation: {reason}")
-            return True
-        
-        all_records = []
-        total_input = 0
-        
-        for year in [2010, 2022]:
-            key = f'sanitation_{year}'
-            bronze_key = self.BRONZE_FILES[key]
-            
-            data = self._read_bronze_json(bronze_key)
-            if not data:
-                logger.warning(f"⚠️ No sanitation data for {year}")
-                continue
-            
-            total_input += len(data) - 1
-            
-            # Extract one record per municipality
-            for row in data[1:]:
-                parsed = self._extract_sidra_data(row)
-                if not parsed:
-                    continue
-                
-                value = self._safe_int(parsed['value'])
-                if value is None:
-                    continue
-                
-                all_records.append({
-                    'municipality_code': parsed['municipality_code'],
-                    'year': year,
-                    'total_households': value,
-                    'households_with_water': None,
-                    'households_with_sewage': None,
-                    'households_with_garbage_collection': None,
-                    'water_coverage_pct': None,
-                    'sewage_coverage_pct': None
-                })
-        
-        if not all_records:
-            logger.error("❌ No sanitation records extracted")
-            self.log_processing('census_sanitation', 'FAILED', total_input, 0,
-                              source_keys, 'silver/fact_sanitation/data.parquet',
-                              'No records extracted')
-            return False
-        
-        df = pd.DataFrame(all_records)
-        df = self.validate_schema(df, 'census_sanitation')
-        
-        df = df.drop_duplicates(subset=['municipality_code', 'year'], keep='first')
-        df = df.sort_values(['municipality_code', 'year']).reset_index(drop=True)
-        
-        success = self._write_silver_parquet(df, output_key)
-        self._write_silver_json(df, output_key.replace('.parquet', '.json'))
-        
-        # Save metadata for smart caching
-        if success:
-            metadata = {
-                'output_file': output_key,
-                'source_files': {key: self._get_bronze_file_hash(key) for key in source_keys},
-                'record_count': len(df),
-                'processed_at': pd.Timestamp.now().isoformat()
-            }
-            self._save_silver_metadata(metadata_key, metadata)
-        
-        self.log_processing('census_sanitation', 'SUCCESS' if success else 'FAILED',
-                          total_input, len(df), source_keys, output_key)
-        
-        logger.info(f"✅ Sanitation: {len(df)} records")
-        return success
+        """Transform sanitation data. Output: silver/fact_sanitation/data.parquet"""
+        return self._transform_fact('sanitation')
 
     def _transform_literacy(self) -> bool:
-        """
-        Transform literacy data from Census 2010 and 2022.
-        
-        Output: silver/fact_literacy/data.parquet
-        """
-        logger.info("📊 Transforming literacy data...")
-        
-        # Check if we can skip processing
-        output_key = 'silver/fact_literacy/data.parquet'
-        metadata_key = 'silver/fact_literacy/_metadata.json'
-        source_keys = [self.BRONZE_FILES['literacy_2010'], self.BRONZE_FILES['literacy_2022']]
-        
-        should_skip, reason = self._should_skip_processing(output_key, metadata_key, source_keys)
-        if should_skip:
-            logger.info(f"⏭️  Skipping literacy: {reason}")
-            return True
-        
-        all_records = []
-        total_input = 0
-        
-        for year in [2010, 2022]:
-            key = f'literacy_{year}'
-            bronze_key = self.BRONZE_FILES[key]
-            
-            data = self._read_bronze_json(bronze_key)
-            if not data:
-                logger.warning(f"⚠️ No literacy data for {year}")
-                continue
-            
-            total_input += len(data) - 1
-            
-            # Extract literacy data - 2022 has rate directly, 2010 has counts
-            for row in data[1:]:
-                parsed = self._extract_sidra_data(row)
-                if not parsed:
-                    continue
-                
-                value = self._safe_float(parsed['value'])
-                if value is None:
-                    continue
-                
-                record = {
-                    'municipality_code': parsed['municipality_code'],
-                    'year': year,
-                    'population_15_plus': None,
-                    'literate_population': None,
-                    'literacy_rate': None
-                }
-                
-                # For 2022 (table 9543), V contains literacy rate %
-                # For 2010 (table 3540), V contains population counts
-                if year == 2022:
-                    record['literacy_rate'] = value
-                else:
-                    record['population_15_plus'] = int(value)
-                
-                all_records.append(record)
-        
-        if not all_records:
-            logger.error("❌ No literacy records extracted")
-            self.log_processing('census_literacy', 'FAILED', total_input, 0,
-                              source_keys, 'silver/fact_literacy/data.parquet',
-                              'No records extracted')
-            return False
-        
-        df = pd.DataFrame(all_records)
-        df = self.validate_schema(df, 'census_literacy')
-        
-        df = df.drop_duplicates(subset=['municipality_code', 'year'], keep='first')
-        df = df.sort_values(['municipality_code', 'year']).reset_index(drop=True)
-        
-        success = self._write_silver_parquet(df, output_key)
-        self._write_silver_json(df, output_key.replace('.parquet', '.json'))
-        
-        # Save metadata for smart caching
-        if success:
-            metadata = {
-                'output_file': output_key,
-                'source_files': {key: self._get_bronze_file_hash(key) for key in source_keys},
-                'record_count': len(df),
-                'processed_at': pd.Timestamp.now().isoformat()
-            }
-            self._save_silver_metadata(metadata_key, metadata)
-        
-        self.log_processing('census_literacy', 'SUCCESS' if success else 'FAILED',
-                          total_input, len(df), source_keys, output_key)
-        
-        logger.info(f"✅ Literacy: {len(df)} records")
-        return success
+        """Transform literacy data. Output: silver/fact_literacy/data.parquet"""
+        return self._transform_fact('literacy')
 
     def _transform_income(self) -> bool:
-        """
-        Transform income data from Census 2010 and 2022.
-        
-        Output: silver/fact_income/data.parquet
-        """
-        logger.info("📊 Transforming income data...")
-        
-        # Check if we can skip processing
-        output_key = 'silver/fact_income/data.parquet'
-        metadata_key = 'silver/fact_income/_metadata.json'
-        source_keys = [self.BRONZE_FILES['income_2010'], self.BRONZE_FILES['income_2022']]
-        
-        should_skip, reason = self._should_skip_processing(output_key, metadata_key, source_keys)
-        if should_skip:
-            logger.info(f"⏭️  Skipping income: {reason}")
-            return True
-        
-        all_records = []
-        total_input = 0
-        
-        for year in [2010, 2022]:
-            key = f'income_{year}'
-            bronze_key = self.BRONZE_FILES[key]
-            
-            data = self._read_bronze_json(bronze_key)
-            if not data:
-                logger.warning(f"⚠️ No income data for {year}")
-                continue
-            
-            total_input += len(data) - 1
-            
-            # Extract income data - V contains average income in R$
-            for row in data[1:]:
-                parsed = self._extract_sidra_data(row)
-                if not parsed:
-                    continue
-                
-                value = self._safe_float(parsed['value'])
-                if value is None:
-                    continue
-                
-                all_records.append({
-                    'municipality_code': parsed['municipality_code'],
-                    'year': year,
-                    'avg_income': value,
-                    'median_income': None,
-                    'population_with_income': None
-                })
-        
-        if not all_records:
-            logger.error("❌ No income records extracted")
-            self.log_processing('census_income', 'FAILED', total_input, 0,
-                              source_keys, 'silver/fact_income/data.parquet',
-                              'No records extracted')
-            return False
-        
-        df = pd.DataFrame(all_records)
-        df = self.validate_schema(df, 'census_income')
-        
-        df = df.drop_duplicates(subset=['municipality_code', 'year'], keep='first')
-        df = df.sort_values(['municipality_code', 'year']).reset_index(drop=True)
-        
-        success = self._write_silver_parquet(df, output_key)
-        self._write_silver_json(df, output_key.replace('.parquet', '.json'))
-        
-        # Save metadata for smart caching
-        if success:
-            metadata = {
-                'output_file': output_key,
-                'source_files': {key: self._get_bronze_file_hash(key) for key in source_keys},
-                'record_count': len(df),
-                'processed_at': pd.Timestamp.now().isoformat()
-            }
-            self._save_silver_metadata(metadata_key, metadata)
-        
-        self.log_processing('census_income', 'SUCCESS' if success else 'FAILED',
-                          total_input, len(df), source_keys, output_key)
-        
-        logger.info(f"✅ Income: {len(df)} records")
-        return success
-
+        """Transform income data. Output: silver/fact_income/data.parquet"""
+        return self._transform_fact('income')
 
 if __name__ == "__main__":
     BUCKET_NAME = "enok-mba-thesis-datalake"
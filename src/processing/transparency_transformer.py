@@ -13,17 +13,34 @@ Features:
 
 import logging
 import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from botocore.exceptions import ClientError
 
 from src.processing.base_transformer import BaseTransformer
 
 logger = logging.getLogger(__name__)
 
+# Monthly bronze files: federal_transfers_YYYY_MM.json
+_MONTHLY_FILE_RE = re.compile(r'federal_transfers_(\d{4})_(\d{2})\.json$')
+_NON_DIGITS_RE = re.compile(r'[^\d]')
+_MONTH_YEAR_RE = re.compile(r'(\d{1,2})/(\d{4})')
+
+# UF abbreviation -> IBGE state code
+_UF_MAP = MappingProxyType({
+    'RO': '11', 'AC': '12', 'AM': '13', 'RR': '14', 'PA': '15', 'AP': '16', 'TO': '17',
+    'MA': '21', 'PI': '22', 'CE': '23', 'RN': '24', 'PB': '25', 'PE': '26', 'AL': '27',
+    'SE': '28', 'BA': '29', 'MG': '31', 'ES': '32', 'RJ': '33', 'SP': '35',
+    'PR': '41', 'SC': '42', 'RS': '43', 'MS': '50', 'MT': '51', 'GO': '52', 'DF': '53'
+})
+
 
 class TransparencyTransformer(BaseTransformer):
     """Transformer for Transparency Portal data (Bronze II → Silver)."""
@@ -36,8 +53,75 @@ class TransparencyTransformer(BaseTransformer):
         'cepim_sanctions': 'bronze/transparency/cepim_compliance.json',
     }
     
+    # Per-registry field layout; paths are pre-split so the record loop never re-splits them
+    REGISTRY_CONFIGS = {
+        'ceis': {
+            'key': 'ceis_sanctions',
+            'type': 'CEIS',
+            'entity_field': ('sancionado',),
+            'doc_field': ('cpfCnpjSancionado',),
+            'sanction_type_field': ('tipoSancao',),
+            'start_date_field': ('dataInicioSancao',),
+            'end_date_field': ('dataFimSancao',),
+            'agency_field': ('orgaoSancionador',)
+        },
+        'cnep': {
+            'key': 'cnep_sanctions',
+            'type': 'CNEP',
+            'entity_field': ('sancionado',),
+            'doc_field': ('cpfCnpjSancionado',),
+            'sanction_type_field': ('tipoSancao',),
+            'start_date_field': ('dataInicioSancao',),
+            'end_date_field': ('dataFimSancao',),
+            'agency_field': ('orgaoSancionador',)
+        },
+        'ceaf': {
+            'key': 'ceaf_sanctions',
+            'type': 'CEAF',
+            'entity_field': ('nome',),
+            'doc_field': ('cpf',),
+            'sanction_type_field': ('tipoPunicao',),
+            'start_date_field': ('dataPublicacao',),
+            'end_date_field': ('dataFimPunicao',),
+            'agency_field': ('orgao',)
+        },
+        'cepim': {
+            'key': 'cepim_sanctions',
+            'type': 'CEPIM',
+            'entity_field': ('convenente',),
+            'doc_field': ('cnpjEntidade',),
+            'sanction_type_field': ('motivoImpedimento',),
+            'start_date_field': ('dataReferencia',),
+            'end_date_field': None,
+            'agency_field': ('orgaoConcedente',)
+        }
+    }
+    
+    # Free-text sanction columns are truncated to these lengths
+    SANCTION_TEXT_LIMITS = {
+        'sanctioned_entity': 500,
+        'sanction_type': 200,
+        'sanctioning_agency': 200,
+    }
+    
     # Federal transfers use monthly file pattern: federal_transfers_YYYY_MM.json
     # Files are discovered dynamically from S3
+    
+    # Transfer and sanction tables are large; JSON sidecars would dwarf the Parquet
+    EMIT_SILVER_JSON = False
+
+    def __init__(self, bucket_name: str, schema_config_path: str):
+        """
+        Initialize the transformer.
+        
+        :param bucket_name: S3 bucket name for the data lake.
+        :param schema_config_path: Path to silver_schemas.json config file.
+        """
+        super().__init__(bucket_name, schema_config_path)
+        # Normalized UF -> state code; configured state codes map to themselves
+        self._state_code_lookup = MappingProxyType(
+            {**{code: code for code in self.state_mapping}, **_UF_MAP}
+        )
 
     def get_source_datasets(self) -> List[str]:
         """Return list of source dataset names."""
@@ -57,6 +141,10 @@ class TransparencyTransformer(BaseTransformer):
         if not self._transform_sanctions():
             success = False
         
+        # Metadata sidecars are written in the background; wait for them before reporting
+        if not self.flush_metadata_writes():
+            success = False
+        
         if success:
             logger.info("✅ Transparency Silver layer transformation complete!")
         else:
@@ -84,7 +172,7 @@ class TransparencyTransformer(BaseTransformer):
             return None
         
         # Remove non-numeric characters
-        clean_doc = re.sub(r'[^\d]', '', str(document))
+        clean_doc = _NON_DIGITS_RE.sub('', str(document))
         
         if doc_type == 'CPF' and len(clean_doc) == 11:
             # CPF: ***.***.XXX-XX (show last 5 digits)
@@ -108,7 +196,7 @@ class TransparencyTransformer(BaseTransformer):
         if not document:
             return 'UNKNOWN'
         
-        clean_doc = re.sub(r'[^\d]', '', str(document))
+        clean_doc = _NON_DIGITS_RE.sub('', str(document))
         
         if len(clean_doc) == 11:
             return 'PF'  # Pessoa Física (CPF)
@@ -117,6 +205,46 @@ class TransparencyTransformer(BaseTransformer):
         else:
             return 'UNKNOWN'
 
+    def _classify_documents(self, documents: pd.Series) -> pd.DataFrame:
+        """
+        Vectorized entity typing and masking for a column of CPF/CNPJ values.
+        
+        Column-wise equivalent of _determine_entity_type followed by
+        _mask_document, avoiding two regex passes per record.
+        
+        :param documents: Raw document values (None/empty when missing).
+        :return: DataFrame with 'entity_type' and 'cpf_cnpj' aligned to the input index.
+        """
+        raw = documents.astype('string')
+        present = raw.notna() & raw.ne('')
+        clean = raw.str.replace(_NON_DIGITS_RE.pattern, '', regex=True)
+        length = clean.str.len()
+        
+        is_pf = present & length.eq(11)
+        is_pj = present & length.eq(14)
+        entity_type = np.select([is_pf, is_pj], ['PF', 'PJ'], default='UNKNOWN')
+        
+        # Unknown formats keep the last 4 digits; shorter values pass through unmasked
+        stars = pd.Series('*', index=clean.index, dtype='string').str.repeat(
+            (length - 4).clip(lower=0).fillna(0).astype(int)
+        )
+        masked = (stars + clean.str[-4:]).astype(object)
+        masked[is_pf] = '***.***' + clean[is_pf].str[6:9] + '-' + clean[is_pf].str[9:]
+        masked[is_pj] = '**.***.***/' + clean[is_pj].str[8:12] + '-' + clean[is_pj].str[12:]
+        masked[~present] = None
+        
+        return pd.DataFrame({'entity_type': entity_type, 'cpf_cnpj': masked}, index=documents.index)
+
+    def _uf_to_state_codes(self, ufs: pd.Series) -> pd.Series:
+        """
+        Vectorized _uf_to_state_code over a column of UF values.
+        
+        :param ufs: UF abbreviations or state codes (None when missing).
+        :return: Series of 2-digit state codes, None where unknown.
+        """
+        codes = ufs.astype('string').str.strip().str.upper().map(self._state_code_lookup)
+        return codes.astype(object).where(codes.notna(), None)
+
     def _list_federal_transfer_files(self) -> List[str]:
         """
         Discover all federal transfer monthly files in S3.
@@ -125,24 +253,24 @@ class TransparencyTransformer(BaseTransformer):
         Returns: List of S3 keys
         """
         try:
-            response = self.s3.list_objects_v2(
+            # Paginate: a single ListObjectsV2 call stops at 1,000 keys
+            paginator = self.s3.get_paginator('list_objects_v2')
+            pages = paginator.paginate(
                 Bucket=self.bucket,
-                Prefix='bronze/transparency/federal_transfers_'
+                Prefix='bronze/transparency/federal_transfers_',
+                PaginationConfig={'PageSize': 1000}
             )
             
-            if 'Contents' not in response:
-                return []
-            
-            # Filter for monthly pattern files only (exclude metadata)
+            # Filter for monthly pattern files only (exclude .meta.json siblings)
             files = []
-            for obj in response['Contents']:
-                key = obj['Key']
-                # Match pattern: federal_transfers_YYYY_MM.json
-                if key.endswith('.json') and not key.endswith('.meta.json'):
-                    # Verify it matches monthly pattern
-                    import re
-                    if re.search(r'federal_transfers_\d{4}_\d{2}\.json$', key):
+            for page in pages:
+                for obj in page.get('Contents', []):
+                    key = obj['Key']
+                    if _MONTHLY_FILE_RE.search(key):
                         files.append(key)
+                        # The listing already carries each ETag; spare the later HeadObject
+                        if obj.get('ETag'):
+                            self._bronze_hash_cache[key] = self._strip_etag(obj['ETag'])
             
             logger.info(f"📁 Discovered {len(files)} federal transfer monthly files")
             return sorted(files)
@@ -166,38 +294,43 @@ class TransparencyTransformer(BaseTransformer):
         output_key = 'silver/fact_federal_transfers/data.parquet'
         metadata_key = 'silver/fact_federal_transfers/.metadata.json'
         
-        # Discover all monthly files
-        monthly_files = self._list_federal_transfer_files()
+        # Discover all monthly files while the previous run's metadata downloads
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            executor.submit(self._get_silver_metadata, metadata_key)
+            monthly_files = self._list_federal_transfer_files()
         
         if not monthly_files:
             logger.warning("⚠️ No federal transfer files found in bronze layer")
             return False
         
         # Smart caching: check if we should skip processing
-        if self._should_skip_processing(output_key, metadata_key, monthly_files):
+        should_skip, reason = self._should_skip_processing(output_key, metadata_key, monthly_files)
+        if should_skip:
+            logger.info(f"⏭️  Skipping federal transfers: {reason}")
             return True
         
-        all_records = []
+        transfer_frames = []
         total_input = 0
         source_keys = []
         processed_count = 0
         skipped_count = 0
         
+        periods = {}
         for bronze_key in monthly_files:
             # Extract year and month from filename
             # Pattern: federal_transfers_YYYY_MM.json
-            import re
-            match = re.search(r'federal_transfers_(\d{4})_(\d{2})\.json$', bronze_key)
+            match = _MONTHLY_FILE_RE.search(bronze_key)
             if not match:
                 logger.warning(f"⚠️ Skipping file with unexpected pattern: {bronze_key}")
                 skipped_count += 1
                 continue
             
-            year = int(match.group(1))
-            month = int(match.group(2))
-            
+            periods[bronze_key] = (int(match.group(1)), int(match.group(2)))
             source_keys.append(bronze_key)
-            data = self._read_bronze_json(bronze_key)
+        
+        # Files download concurrently; records are extracted as each one arrives
+        for bronze_key, data in self._read_bronze_files(source_keys):
+            year, month = periods[bronze_key]
             
             if not data:
                 logger.warning(f"⚠️ No data in {bronze_key} - skipping")
@@ -207,87 +340,44 @@ class TransparencyTransformer(BaseTransformer):
             total_input += len(data)
             processed_count += 1
             
-            for record in data:
-                # Parse the Transparency Portal format
-                # Common fields vary by endpoint version
-                
-                # Try to extract relevant fields
-                transfer_record = {
-                    'municipality_code': None,  # Not directly available in this endpoint
-                    'year': year,
-                    'month': month,  # Use month from filename (more reliable)
-                    'transfer_amount': self._safe_float(
-                        record.get('valor') or 
-                        record.get('valorRecebido') or 
-                        record.get('valorTotal')
-                    ),
-                    'transfer_type': (
-                        record.get('tipoTransferencia') or 
-                        record.get('tipo') or 
-                        record.get('descricao') or
-                        'FEDERAL_TRANSFER'
-                    ),
-                    'source_agency': (
-                        record.get('orgaoSuperior', {}).get('nome') if isinstance(record.get('orgaoSuperior'), dict) else
-                        record.get('orgaoSuperior') or
-                        record.get('unidadeGestora', {}).get('nome') if isinstance(record.get('unidadeGestora'), dict) else
-                        record.get('unidadeGestora') or
-                        'UNKNOWN'
-                    )
-                }
-                
-                # Try to extract municipality code from recipient info
-                municipio = record.get('municipio', {})
-                if isinstance(municipio, dict):
-                    muni_code = municipio.get('codigoIBGE') or municipio.get('codigo')
-                    if muni_code:
-                        transfer_record['municipality_code'] = self._extract_municipality_code(muni_code)
-                
-                # Skip records without valid amount
-                if transfer_record['transfer_amount'] is None:
-                    continue
-                
-                all_records.append(transfer_record)
+            transfer_frames.append(self._normalize_transfers(data, year, month))
         
         logger.info(f"📈 Processed {processed_count} files, skipped {skipped_count} files")
         
-        if not all_records:
+        df = pd.concat(transfer_frames, ignore_index=True) if transfer_frames else pd.DataFrame()
+        
+        if not df.empty:
+            # Skip records without valid amount and remove duplicates in a single pass
+            valid = df['transfer_amount'].notna()
+            before_dedup = int(valid.sum())
+            df = df.loc[valid].drop_duplicates(
+                subset=['year', 'month', 'transfer_type', 'transfer_amount'], keep='first'
+            )
+            if before_dedup > len(df):
+                logger.info(f"🔄 Removed {before_dedup - len(df)} duplicate records")
+        
+        if df.empty:
             logger.warning("⚠️ No federal transfer records extracted")
             self.log_processing('federal_transfers', 'FAILED', total_input, 0,
                               source_keys, output_key,
                               'No records extracted')
             return False
         
-        df = pd.DataFrame(all_records)
+        # transfer_type and source_agency come back categorical (see silver_schemas.json)
         df = self.validate_schema(df, 'federal_transfers')
+        df = df.astype({'year': 'Int16', 'month': 'Int8'})
         
-        # Remove duplicates based on key columns
-        before_dedup = len(df)
-        df = df.drop_duplicates(subset=['year', 'month', 'transfer_type', 'transfer_amount'], keep='first')
-        after_dedup = len(df)
-        if before_dedup > after_dedup:
-            logger.info(f"🔄 Removed {before_dedup - after_dedup} duplicate records")
-        
-        # Sort by municipality, year, month
-        df = df.sort_values(['municipality_code', 'year', 'month']).reset_index(drop=True)
+        # Sort by year, municipality, month; each year lands in its own row groups
+        df = df.sort_values(['year', 'municipality_code', 'month'])
         
-        success = self._write_silver_parquet(df, output_key)
-        self._write_silver_json(df, output_key.replace('.parquet', '.json'))
+        success = self._write_silver_parquet(df, output_key, partition_cols=['year'],
+                                             write_statistics=['municipality_code', 'year', 'month'])
+        if self.EMIT_SILVER_JSON:
+            self._write_silver_json(df, output_key.replace('.parquet', '.json'))
         
         # Save metadata tracking source files
         if success:
-            source_file_hashes = {}
-            for s3_key in source_keys:
-                file_hash = self._get_bronze_file_hash(s3_key)
-                if file_hash:
-                    source_file_hashes[s3_key] = file_hash
-            
-            metadata = {
-                'source_files': source_file_hashes,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'record_count': len(df),
-                'files_processed': processed_count
-            }
+            metadata = self._build_metadata(output_key, source_keys, len(df), files_processed=processed_count)
             self._save_silver_metadata(metadata_key, metadata)
         
         self.log_processing('federal_transfers', 'SUCCESS' if success else 'FAILED',
@@ -296,6 +386,57 @@ class TransparencyTransformer(BaseTransformer):
         logger.info(f"✅ Federal Transfers: {len(df)} records from {processed_count} monthly files")
         return success
 
+    def _normalize_transfers(self, data: List[Dict], year: int, month: int) -> pd.DataFrame:
+        """
+        Flatten one monthly federal transfers file into Silver columns.
+        
+        Field names vary by endpoint version, so each output column takes the
+        first non-empty candidate field, in priority order.
+        
+        :param data: Records from one monthly bronze file.
+        :param year: Year from the file name.
+        :param month: Month from the file name (more reliable than record dates).
+        :return: DataFrame with one row per record; transfer_amount is NaN if invalid.
+        """
+        fields = [
+            'valor', 'valorRecebido', 'valorTotal',
+            'tipoTransferencia', 'tipo', 'descricao',
+            'orgaoSuperior.nome', 'orgaoSuperior', 'unidadeGestora.nome', 'unidadeGestora',
+            'municipio.codigoIBGE', 'municipio.codigo',
+        ]
+        raw = pd.json_normalize(data, max_level=1).reindex(columns=fields)
+        # Falsy values ('', 0, False) count as missing, like the `or` chains they replace:
+        # a zero 'valor' falls through to the next field and, if none is set, drops the row
+        present = (raw.notna() & (raw != '') & (raw != 0)).to_numpy()
+        values = raw.to_numpy(dtype=object)
+        rows = np.arange(len(raw))
+        
+        def first_of(*columns: str) -> pd.Series:
+            # Pick per row from the object array; a pandas bfill here downcasts (deprecated in 2.2)
+            positions = [raw.columns.get_loc(c) for c in columns]
+            found = present[:, positions]
+            picked = values[rows, np.asarray(positions)[found.argmax(axis=1)]]
+            picked[~found.any(axis=1)] = None
+            return pd.Series(picked, index=raw.index, dtype=object)
+        
+        # Nested dicts flatten to 'parent.nome'; a plain string stays under 'parent'
+        agency = first_of('orgaoSuperior.nome', 'orgaoSuperior', 'unidadeGestora.nome', 'unidadeGestora')
+        muni_codes = first_of('municipio.codigoIBGE', 'municipio.codigo').astype('string')
+        
+        df = pd.DataFrame({
+            'municipality_code': self._extract_municipality_codes(
+                pa.array(muni_codes, type=pa.string(), from_pandas=True)
+            ).to_pandas(),
+            # Narrow scalars keep the concat and dedup hashing cheap
+            'year': np.int16(year),
+            'month': np.int8(month),
+            'transfer_amount': self._to_numeric_series(first_of('valor', 'valorRecebido', 'valorTotal')),
+            'transfer_type': first_of('tipoTransferencia', 'tipo', 'descricao').fillna('FEDERAL_TRANSFER'),
+            'source_agency': agency.fillna('UNKNOWN'),
+        })
+        
+        return df
+
     def _extract_month(self, record: Dict) -> Optional[int]:
         """Extract month from transfer record."""
         # Try various date fields
@@ -311,7 +452,7 @@ class TransparencyTransformer(BaseTransformer):
                     return parsed.month
                 
                 # Try to extract month from MM/YYYY format
-                match = re.match(r'(\d{1,2})/(\d{4})', value)
+                match = _MONTH_YEAR_RE.match(value)
                 if match:
                     return int(match.group(1))
         
@@ -325,7 +466,7 @@ class TransparencyTransformer(BaseTransformer):
         """
         logger.info("📊 Transforming compliance sanctions data...")
         
-        all_records = []
+        registry_frames = []
         total_input = 0
         source_keys = []
         
@@ -336,60 +477,23 @@ class TransparencyTransformer(BaseTransformer):
         potential_sources = list(self.SANCTIONS_FILES.values())
         
         # Smart caching: check if we should skip processing
-        if self._should_skip_processing(output_key, metadata_key, potential_sources):
+        should_skip, reason = self._should_skip_processing(output_key, metadata_key, potential_sources)
+        if should_skip:
+            logger.info(f"⏭️  Skipping compliance sanctions: {reason}")
             return True
         
-        registry_configs = {
-            'ceis': {
-                'key': 'ceis_sanctions',
-                'type': 'CEIS',
-                'entity_field': 'sancionado',
-                'doc_field': 'cpfCnpjSancionado',
-                'sanction_type_field': 'tipoSancao',
-                'start_date_field': 'dataInicioSancao',
-                'end_date_field': 'dataFimSancao',
-                'agency_field': 'orgaoSancionador'
-            },
-            'cnep': {
-                'key': 'cnep_sanctions',
-                'type': 'CNEP',
-                'entity_field': 'sancionado',
-                'doc_field': 'cpfCnpjSancionado',
-                'sanction_type_field': 'tipoSancao',
-                'start_date_field': 'dataInicioSancao',
-                'end_date_field': 'dataFimSancao',
-                'agency_field': 'orgaoSancionador'
-            },
-            'ceaf': {
-                'key': 'ceaf_sanctions',
-                'type': 'CEAF',
-                'entity_field': 'nome',
-                'doc_field': 'cpf',
-                'sanction_type_field': 'tipoPunicao',
-                'start_date_field': 'dataPublicacao',
-                'end_date_field': 'dataFimPunicao',
-                'agency_field': 'orgao'
-            },
-            'cepim': {
-                'key': 'cepim_sanctions',
-                'type': 'CEPIM',
-                'entity_field': 'convenente',
-                'doc_field': 'cnpjEntidade',
-                'sanction_type_field': 'motivoImpedimento',
-                'start_date_field': 'dataReferencia',
-                'end_date_field': None,
-                'agency_field': 'orgaoConcedente'
-            }
-        }
-        
-        for registry_name, config in registry_configs.items():
+        registry_sources = {}
+        for registry_name, config in self.REGISTRY_CONFIGS.items():
             bronze_key = self.SANCTIONS_FILES.get(config['key'])
             if not bronze_key:
                 logger.warning(f"⚠️ No bronze key configured for {config['key']}")
                 continue
             
+            registry_sources[bronze_key] = config
             source_keys.append(bronze_key)
-            data = self._read_bronze_json(bronze_key)
+        
+        for bronze_key, data in self._read_bronze_files(source_keys):
+            config = registry_sources[bronze_key]
             
             if not data:
                 logger.warning(f"⚠️ No {config['type']} sanctions data - skipping")
@@ -397,76 +501,26 @@ class TransparencyTransformer(BaseTransformer):
             
             total_input += len(data)
             
-            for idx, record in enumerate(data):
-                # Extract entity name
-                entity_name = self._extract_nested_value(record, config['entity_field'])
-                if isinstance(entity_name, dict):
-                    entity_name = entity_name.get('nome') or entity_name.get('razaoSocial') or str(entity_name)
-                
-                # Extract document (CPF/CNPJ)
-                document = self._extract_nested_value(record, config['doc_field'])
-                entity_type = self._determine_entity_type(document)
-                
-                # Extract sanction type
-                sanction_type = self._extract_nested_value(record, config['sanction_type_field'])
-                if isinstance(sanction_type, dict):
-                    sanction_type = sanction_type.get('descricao') or sanction_type.get('nome') or str(sanction_type)
-                
-                # Extract dates
-                start_date = self._parse_date(
-                    self._extract_nested_value(record, config['start_date_field'])
-                )
-                
-                end_date = None
-                if config['end_date_field']:
-                    end_date = self._parse_date(
-                        self._extract_nested_value(record, config['end_date_field'])
-                    )
-                
-                # Extract sanctioning agency
-                agency = self._extract_nested_value(record, config['agency_field'])
-                if isinstance(agency, dict):
-                    agency = agency.get('nome') or agency.get('sigla') or str(agency)
-                
-                # Extract location info if available
-                state_code = None
-                municipality_code = None
-                
-                uf = record.get('ufSancionado') or record.get('uf')
-                if uf:
-                    # Convert UF name/abbrev to code if needed
-                    state_code = self._uf_to_state_code(uf)
-                
-                # Generate unique sanction ID
-                sanction_id = f"{config['type']}_{idx:08d}"
-                if document:
-                    doc_hash = hash(str(document)) % 10000000
-                    sanction_id = f"{config['type']}_{doc_hash:07d}_{idx:05d}"
-                
-                sanction_record = {
-                    'sanction_id': sanction_id,
-                    'registry_type': config['type'],
-                    'sanctioned_entity': str(entity_name)[:500] if entity_name else None,
-                    'entity_type': entity_type,
-                    'cpf_cnpj': self._mask_document(document, 'CPF' if entity_type == 'PF' else 'CNPJ'),
-                    'sanction_type': str(sanction_type)[:200] if sanction_type else None,
-                    'sanction_start_date': start_date,
-                    'sanction_end_date': end_date,
-                    'sanctioning_agency': str(agency)[:200] if agency else None,
-                    'state_code': state_code,
-                    'municipality_code': municipality_code
-                }
-                
-                all_records.append(sanction_record)
+            registry_frames.append(self._normalize_sanctions(data, config))
         
-        if not all_records:
+        df = pd.concat(registry_frames, ignore_index=True) if registry_frames else pd.DataFrame()
+        
+        if df.empty:
             logger.warning("⚠️ No sanction records extracted")
             self.log_processing('compliance_sanctions', 'FAILED', total_input, 0,
                               source_keys, output_key,
                               'No records extracted')
             return False
         
-        df = pd.DataFrame(all_records)
+        # Truncate free text in one pass per column; empty values become missing
+        for column, max_length in self.SANCTION_TEXT_LIMITS.items():
+            text = df[column].astype('string').str.slice(0, max_length)
+            df[column] = text.astype(object).where(text.notna() & text.ne(''), None)
+        
+        # Entity type and masking run once over the whole column; the raw document never reaches Silver
+        df[['entity_type', 'cpf_cnpj']] = self._classify_documents(df['document'])
+        df = df.drop(columns='document')
+        # registry_type, entity_type and state_code come back categorical (see silver_schemas.json)
         df = self.validate_schema(df, 'compliance_sanctions')
         
         # Remove duplicates based on sanction_id
@@ -477,23 +531,15 @@ class TransparencyTransformer(BaseTransformer):
             logger.info(f"🔄 Removed {before_dedup - after_dedup} duplicate records")
         
         # Sort by registry type and sanction ID
-        df = df.sort_values(['registry_type', 'sanction_id']).reset_index(drop=True)
-        success = self._write_silver_parquet(df, output_key)
-        self._write_silver_json(df, output_key.replace('.parquet', '.json'))
+        df = df.sort_values(['registry_type', 'sanction_id'])
+        success = self._write_silver_parquet(df, output_key, partition_cols=['registry_type'],
+                                             write_statistics=['registry_type'])
+        if self.EMIT_SILVER_JSON:
+            self._write_silver_json(df, output_key.replace('.parquet', '.json'))
         
         # Save metadata tracking source files
         if success:
-            source_file_hashes = {}
-            for s3_key in source_keys:
-                file_hash = self._get_bronze_file_hash(s3_key)
-                if file_hash:
-                    source_file_hashes[s3_key] = file_hash
-            
-            metadata = {
-                'source_files': source_file_hashes,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'record_count': len(df)
-            }
+            metadata = self._build_metadata(output_key, source_keys, len(df))
             self._save_silver_metadata(metadata_key, metadata)
         
         self.log_processing('compliance_sanctions', 'SUCCESS' if success else 'FAILED',
@@ -507,18 +553,87 @@ class TransparencyTransformer(BaseTransformer):
         
         return success
 
-    def _extract_nested_value(self, record: Dict, field_path: str) -> Any:
+    def _normalize_sanctions(self, data: List[Dict], config: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Flatten one sanctions registry file into Silver columns.
+        
+        Building one frame per registry frees each file's record dicts before the
+        next file is parsed, instead of holding every registry's dicts until the end.
+        
+        :param data: Records from one registry bronze file.
+        :param config: Registry entry from REGISTRY_CONFIGS.
+        :return: DataFrame with one row per record and the raw 'document' column.
+        """
+        records = []
+        
+        for idx, record in enumerate(data):
+            # Extract entity name
+            entity_name = self._extract_nested_value(record, config['entity_field'])
+            if isinstance(entity_name, dict):
+                entity_name = entity_name.get('nome') or entity_name.get('razaoSocial') or str(entity_name)
+            
+            # Extract document (CPF/CNPJ)
+            document = self._extract_nested_value(record, config['doc_field'])
+            
+            # Extract sanction type
+            sanction_type = self._extract_nested_value(record, config['sanction_type_field'])
+            if isinstance(sanction_type, dict):
+                sanction_type = sanction_type.get('descricao') or sanction_type.get('nome') or str(sanction_type)
+            
+            # Extract raw dates (parsed column-wise per registry below)
+            start_date = self._extract_nested_value(record, config['start_date_field'])
+            end_date = self._extract_nested_value(record, config['end_date_field'])
+            
+            # Extract sanctioning agency
+            agency = self._extract_nested_value(record, config['agency_field'])
+            if isinstance(agency, dict):
+                agency = agency.get('nome') or agency.get('sigla') or str(agency)
+            
+            # Extract location info if available (UF is mapped to a state code per registry below)
+            municipality_code = None
+            uf = record.get('ufSancionado') or record.get('uf')
+            
+            # Generate unique sanction ID
+            sanction_id = f"{config['type']}_{idx:08d}"
+            if document:
+                # crc32 is stable across runs, unlike the per-process salted hash()
+                doc_hash = zlib.crc32(str(document).encode('utf-8')) % 10_000_000
+                sanction_id = f"{config['type']}_{doc_hash:07d}_{idx:05d}"
+            
+            sanction_record = {
+                'sanction_id': sanction_id,
+                'registry_type': config['type'],
+                'sanctioned_entity': entity_name,
+                'document': document,
+                'sanction_type': sanction_type,
+                'sanction_start_date': start_date,
+                'sanction_end_date': end_date,
+                'sanctioning_agency': agency,
+                'uf': uf,
+                'municipality_code': municipality_code
+            }
+            
+            records.append(sanction_record)
+        
+        df = pd.DataFrame(records)
+        df['state_code'] = self._uf_to_state_codes(df.pop('uf'))
+        df['sanction_start_date'] = self._to_datetime_series(df['sanction_start_date'])
+        df['sanction_end_date'] = self._to_datetime_series(df['sanction_end_date'])
+        return df
+
+    def _extract_nested_value(self, record: Dict, field_path: Union[str, Tuple[str, ...]]) -> Any:
         """
         Extract a value from a record, handling nested dictionaries.
         
         :param record: Source record dictionary.
-        :param field_path: Field name or dot-separated path (e.g., 'orgao.nome').
+        :param field_path: Dot-separated path (e.g., 'orgao.nome') or a pre-split
+                           tuple of keys (e.g., ('orgao', 'nome')).
         :return: Extracted value or None.
         """
         if not field_path:
             return None
         
-        parts = field_path.split('.')
+        parts = field_path.split('.') if isinstance(field_path, str) else field_path
         value = record
         
         for part in parts:
@@ -539,25 +654,8 @@ class TransparencyTransformer(BaseTransformer):
         if not uf:
             return None
         
-        uf = str(uf).strip().upper()
-        
-        # UF abbreviation to state code mapping
-        uf_map = {
-            'RO': '11', 'AC': '12', 'AM': '13', 'RR': '14', 'PA': '15', 'AP': '16', 'TO': '17',
-            'MA': '21', 'PI': '22', 'CE': '23', 'RN': '24', 'PB': '25', 'PE': '26', 'AL': '27',
-            'SE': '28', 'BA': '29', 'MG': '31', 'ES': '32', 'RJ': '33', 'SP': '35',
-            'PR': '41', 'SC': '42', 'RS': '43', 'MS': '50', 'MT': '51', 'GO': '52', 'DF': '53'
-        }
-        
-        # Direct lookup
-        if uf in uf_map:
-            return uf_map[uf]
-        
-        # If it's already a code, validate it
-        if uf.isdigit() and uf in self.state_mapping:
-            return uf
-        
-        return None
+        # UF abbreviations and already-valid state codes share one lookup
+        return self._state_code_lookup.get(str(uf).strip().upper())
 
 
 if __name__ == "__main__":
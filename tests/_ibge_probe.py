@@ -0,0 +1,119 @@
+"""
+Shared SIDRA endpoint probe for the IBGE live check scripts.
+
+test_ibge_ingestion.py and test_ibge_metadata.py both validate every configured
+dataset with a single-municipality query; the sweep lives here so it is written
+(and, within one process, run) once.
+"""
+
+import os
+import sys
+import json
+import functools
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ingestion.ingestion_utils import SkipMarkerCache
+
+IBGE_CONFIG_PATH = Path(__file__).parent.parent / "config" / "ibge_metadata.json"
+
+# Test probe: Requesting only 1 municipality to save time/bandwidth
+# Code 1100015 = Alta Floresta D'Oeste - RO
+GEO_PROBE = "n6/1100015"
+
+# Passing probes are remembered for a day, keyed by URL (a config change yields a new URL);
+# set IBGE_PROBE_CACHE=0 to always hit the API
+PROBE_CACHE_TTL_SECONDS = 24 * 3600
+
+# One pooled keep-alive session for every SIDRA probe (skips a TLS handshake per request)
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                      raise_on_status=False)
+))
+
+@functools.lru_cache(maxsize=1)
+def load_ibge_config():
+    """Parse ibge_metadata.json once per process (callers must not mutate the result)."""
+    return json.loads(IBGE_CONFIG_PATH.read_bytes())
+
+@functools.lru_cache(maxsize=1)
+def get_probe_cache():
+    """Passing-probe cache, or None when disabled via IBGE_PROBE_CACHE=0."""
+    if os.getenv("IBGE_PROBE_CACHE", "1") != "1":
+        return None
+    return SkipMarkerCache(scope="ibge_probes", ttl_seconds=PROBE_CACHE_TTL_SECONDS)
+
+def build_probe_url(base_url, ds):
+    """Build the single-municipality probe URL for one dataset."""
+    # quote() encodes every reserved character in the period (e.g. 'last 1'), not just spaces
+    url = f"{base_url}/t/{ds['table_id']}/{GEO_PROBE}/v/{ds.get('variable', 'allxp')}/p/{quote(str(ds['period']), safe='')}"
+    if ds.get('classifications'):
+        url += f"/{ds['classifications']}"
+    return url + "?formato=json"
+
+def probe_url(name, url):
+    """
+    Fetch one probe URL (or reuse a recent pass).
+    :return: (name, status, details) with status 'PASS', 'WARN' or 'FAIL'.
+    """
+    cache = get_probe_cache()
+    cached = cache.get(url) if cache else None
+    if cached is not None:
+        return name, "PASS", f"{cached} (cached)"
+
+    try:
+        # Short timeout since we are only fetching 1 row
+        response = SESSION.get(url, timeout=20)
+
+        if response.status_code == 200:
+            data = response.json()
+            # Sidra returns a list; index 0 is header, index 1 is the data
+            if isinstance(data, list) and len(data) > 1:
+                details = f"{len(data)} records"
+                if cache:
+                    cache.set(url, details)
+                return name, "PASS", details
+            return name, "WARN", "Empty result (check period/variable)"
+        return name, "FAIL", f"HTTP {response.status_code}"
+
+    except Exception as e:
+        return name, "FAIL", str(e)
+
+@functools.lru_cache(maxsize=4)
+def _probe_sweep(probe_urls):
+    """Probe every (name, url) pair concurrently; memoized so a second caller in the process reuses it."""
+    # Probes are network-bound: run them together (map keeps config order)
+    with ThreadPoolExecutor(max_workers=len(probe_urls)) as executor:
+        return tuple(executor.map(lambda probe: probe_url(*probe), probe_urls))
+
+def build_probe_urls(config):
+    """Freeze a config's probe targets as a tuple of (name, url), in config order."""
+    base_url = config['api_base_url']
+    return tuple((ds['name'], build_probe_url(base_url, ds)) for ds in config['datasets'])
+
+@functools.lru_cache(maxsize=1)
+def get_probe_urls():
+    """Probe targets for config/ibge_metadata.json, built once per process."""
+    return build_probe_urls(load_ibge_config())
+
+def probe_all(config=None):
+    """
+    Probe every dataset in an IBGE metadata config.
+    :param config: Parsed ibge_metadata.json contents (default: the project config).
+    :return: Tuple of (name, status, details), in config order.
+    """
+    # URLs are built before any request goes out, so workers only do network I/O
+    probe_urls = get_probe_urls() if config is None else build_probe_urls(config)
+    if not probe_urls:
+        return ()
+    return _probe_sweep(probe_urls)
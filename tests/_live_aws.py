@@ -0,0 +1,38 @@
+"""
+Shared AWS helpers for the live Bronze check scripts.
+
+test_ibge_ingestion.py and test_transparency_ingestion.py both need an S3
+client, a credentials check, and the opt-in gate for their S3 upload test.
+"""
+
+import os
+import sys
+import functools
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+AWS_CLIENT_CONFIG = Config(max_pool_connections=16, retries={'max_attempts': 3, 'mode': 'adaptive'})
+
+@functools.lru_cache(maxsize=1)
+def get_s3_client():
+    """Build the S3 client once (region and credential resolution run on first use only)."""
+    return boto3.client('s3', config=AWS_CLIENT_CONFIG)
+
+@functools.lru_cache(maxsize=1)
+def aws_credentials_available():
+    """One STS GetCallerIdentity call: are AWS credentials configured and valid?"""
+    try:
+        boto3.client('sts', config=AWS_CLIENT_CONFIG).get_caller_identity()
+        return True
+    except (BotoCoreError, ClientError):
+        return False
+
+def confirm_s3_ingestion():
+    """Should main() run the S3 upload test?"""
+    # RUN_S3_INGESTION=1 opts in without the prompt; non-interactive runs never block on input()
+    return os.getenv("RUN_S3_INGESTION") == "1" or (
+        sys.stdin.isatty()
+        and input("\n⚠️  Proceed with S3 ingestion test? This will upload data. (yes/no): ").lower() in ['yes', 'y']
+    )
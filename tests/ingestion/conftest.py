@@ -0,0 +1,20 @@
+"""
+Shared fixtures for ingestion tests.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def mock_boto3_client():
+    """Stub boto3.client for every ingestion test; each test gets a fresh S3 mock."""
+    with patch('boto3.client', return_value=MagicMock()) as mock_client:
+        yield mock_client
+
+
+@pytest.fixture
+def mock_s3(mock_boto3_client):
+    """The S3 client mock handed to ingestors created during the test."""
+    return mock_boto3_client.return_value
@@ -1,10 +1,11 @@
-import unittest
 import json
-import tempfile
-import os
-from unittest.mock import Mock, patch, MagicMock
+import hashlib
+from unittest.mock import Mock, patch
 from pathlib import Path
 import sys
+
+import pytest
+import requests
 from botocore.exceptions import ClientError
 
 # Add parent directory to path
@@ -12,281 +13,249 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.ingestion.ibge_client import IBGEIngestor
 
+# Canned SIDRA payload and its MD5, computed once at import
+_TEST_CONTENT = '[{"header": "test"}, {"data": "value"}]'
+_EXPECTED_MD5 = hashlib.md5(_TEST_CONTENT.encode('utf-8')).hexdigest()
 
-class TestIBGEIngestor(unittest.TestCase):
-    """Unit tests for IBGEIngestor class."""
-    
-    def setUp(self):
-        """Set up test fixtures."""
-        # Create temporary config file
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_data = {
-            "api_base_url": "https://apisidra.ibge.gov.br/values",
-            "datasets": [
-                {
-                    "name": "test_pop_2010",
-                    "table_id": "1378",
-                    "period": "all",
-                    "variable": "allxp",
-                    "classifications": "c1/0",
-                    "filename": "test_pop.json"
-                },
-                {
-                    "name": "test_pop_2022",
-                    "table_id": "4714",
-                    "period": "last 1",
-                    "variable": "93",
-                    "classifications": "",
-                    "filename": "test_pop_2022.json"
-                }
-            ]
+CONFIG_DATA = {
+    "api_base_url": "https://apisidra.ibge.gov.br/values",
+    "datasets": [
+        {
+            "name": "test_pop_2010",
+            "table_id": "1378",
+            "period": "all",
+            "variable": "allxp",
+            "classifications": "c1/0",
+            "filename": "test_pop.json"
+        },
+        {
+            "name": "test_pop_2022",
+            "table_id": "4714",
+            "period": "last 1",
+            "variable": "93",
+            "classifications": "",
+            "filename": "test_pop_2022.json"
         }
-        
-        self.config_path = os.path.join(self.temp_dir, "test_config.json")
-        with open(self.config_path, 'w') as f:
-            json.dump(self.config_data, f)
-        
-        # Mock S3 client
-        self.mock_s3 = MagicMock()
-        
-    def tearDown(self):
-        """Clean up test fixtures."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+    ]
+}
+
+
+@pytest.fixture(scope="module")
+def config_path(tmp_path_factory):
+    """Write the ingestor config to disk for the path-based constructor test."""
+    path = tmp_path_factory.mktemp("ibge") / "test_config.json"
+    path.write_bytes(json.dumps(CONFIG_DATA).encode('utf-8'))
+    return str(path)
+
+
+def _mk_response(status=200, text='{}', content_type='application/json', exc=None):
+    """A canned requests response; exc makes raise_for_status fail."""
+    response = Mock()
+    response.status_code = status
+    response.text = text
+    response.headers = {'Content-Type': content_type}
+    response.raise_for_status = Mock(side_effect=exc)
+    return response
+
+
+def test_init(mock_boto3_client):
+    """Test IBGEIngestor initialization."""
+    ingestor = IBGEIngestor.from_dict("test-bucket", CONFIG_DATA)
+    
+    assert ingestor.bucket == "test-bucket"
+    assert ingestor.config == CONFIG_DATA
+    mock_boto3_client.assert_called_once_with('s3')
+
+
+def test_load_config(config_path):
+    """Test configuration loading from a file path."""
+    ingestor = IBGEIngestor("test-bucket", config_path)
+    
+    assert ingestor.config == CONFIG_DATA
+
+
+def test_init_requires_config():
+    """Test that a config path or dict is required."""
+    with pytest.raises(ValueError):
+        IBGEIngestor("test-bucket")
+
+
+def test_file_is_valid_exists_and_matches(mock_s3):
+    """Test file validation when file exists and MD5 matches."""
+    # Mock S3 head_object to return matching ETag
+    mock_s3.head_object.return_value = {'ETag': '"abc123"'}
     
-    @patch('src.ingestion.ibge_client.boto3.client')
-    def test_init(self, mock_boto3):
-        """Test IBGEIngestor initialization."""
-        mock_boto3.return_value = self.mock_s3
-        
-        ingestor = IBGEIngestor("test-bucket", self.config_path)
-        
-        self.assertEqual(ingestor.bucket, "test-bucket")
-        self.assertEqual(ingestor.config, self.config_data)
-        mock_boto3.assert_called_once_with('s3')
+    ingestor = IBGEIngestor.from_dict("test-bucket", CONFIG_DATA)
     
-    @patch('src.ingestion.ibge_client.boto3.client')
-    def test_load_config(self, mock_boto3):
-        """Test configuration loading."""
-        mock_boto3.return_value = self.mock_s3
-        
-        ingestor = IBGEIngestor("test-bucket", self.config_path)
-        
-        self.assertIn("api_base_url", ingestor.config)
-        self.assertIn("datasets", ingestor.config)
-        self.assertEqual(len(ingestor.config["datasets"]), 2)
+    assert ingestor._file_is_valid("test/key.json", "abc123")
+    mock_s3.head_object.assert_called_once_with(
+        Bucket="test-bucket",
+        Key="test/key.json"
+    )
+
+
+def test_file_is_valid_exists_but_different(mock_s3):
+    """Test file validation when file exists but MD5 differs."""
+    # Mock S3 head_object to return different ETag
+    mock_s3.head_object.return_value = {'ETag': '"different123"'}
     
-    @patch('src.ingestion.ibge_client.boto3.client')
-    def test_file_is_valid_exists_and_matches(self, mock_boto3):
-        """Test file validation when file exists and MD5 matches."""
-        mock_boto3.return_value = self.mock_s3
-        
-        # Mock S3 head_object to return matching ETag
-        self.mock_s3.head_object.return_value = {
-            'ETag': '"abc123"'
-        }
-        
-        ingestor = IBGEIngestor("test-bucket", self.config_path)
-        
-        result = ingestor._file_is_valid("test/key.json", "abc123")
-        
-        self.assertTrue(result)
-        self.mock_s3.head_object.assert_called_once_with(
-            Bucket="test-bucket",
-            Key="test/key.json"
-        )
+    ingestor = IBGEIngestor.from_dict("test-bucket", CONFIG_DATA)
     
-    @patch('src.ingestion.ibge_client.boto3.client')
-    def test_file_is_valid_exists_but_different(self, mock_boto3):
-        """Test file validation when file exists but MD5 differs."""
-        mock_boto3.return_value = self.mock_s3
-        
-        # Mock S3 head_object to return different ETag
-        self.mock_s3.head_object.return_value = {
-            'ETag': '"different123"'
-        }
-        
-        ingestor = IBGEIngestor("test-bucket", self.config_path)
-        
-        result = ingestor._file_is_valid("test/key.json", "abc123")
-        
-        self.assertFalse(result)
+    assert not ingestor._file_is_valid("test/key.json", "abc123")
+
+
+def test_file_is_valid_not_exists(mock_s3):
+    """Test file validation when file doesn't exist."""
+    # Mock S3 head_object to raise ClientError
+    mock_s3.head_object.side_effect = ClientError(
+        {'Error': {'Code': '404'}}, 'HeadObject'
+    )
     
-    @patch('src.ingestion.ibge_client.boto3.client')
-    def test_file_is_valid_not_exists(self, mock_boto3):
-        """Test file validation when file doesn't exist."""
-        mock_boto3.return_value = self.mock_s3
-        
-        # Mock S3 head_object to raise ClientError
-        from botocore.exceptions import ClientError
-        self.mock_s3.head_object.side_effect = ClientError(
-            {'Error': {'Code': '404'}}, 'HeadObject'
-        )
-        
-        ingestor = IBGEIngestor("test-bucket", self.config_path)
-        
-        result = ingestor._file_is_valid("test/key.json", "abc123")
-        
-        self.assertFalse(result)
+    ingestor = IBGEIngestor.from_dict("test-bucket", CONFIG_DATA)
     
-    @patch('src.ingestion.ibge_client.boto3.client')
-    @patch('src.ingestion.http_client.requests.get')
-    def test_fetch_with_retry_success(self, mock_get, mock_boto3):
-        """Test successful API fetch."""
-        mock_boto3.return_value = self.mock_s3
-        
-        # Mock successful response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = '{"data": "test"}'
-        mock_response.headers = {'Content-Type': 'application/json'}
-        mock_response.raise_for_status = Mock()
-        mock_get.return_value = mock_response
-        
-        ingestor = IBGEIngestor("test-bucket", self.config_path)
-        
-        result = ingestor.fetch_with_retry("http://test.url")
-        
-        self.assertEqual(result, '{"data": "test"}')
-        mock_get.assert_called_once()
+    assert not ingestor._file_is_valid("test/key.json", "abc123")
+
+
+@patch('src.ingestion.http_client.requests.get')
+def test_fetch_with_retry_success(mock_get):
+    """Test successful API fetch."""
+    mock_get.return_value = _mk_response(text='{"data": "test"}')
     
-    @patch('src.ingestion.ibge_client.boto3.client')
-    @patch('src.ingestion.http_client.requests.get')
-    @patch('src.ingestion.http_client.time.sleep')
-    def test_fetch_with_retry_eventual_success(self, mock_sleep, mock_get, mock_boto3):
-        """Test API fetch with retry that eventually succeeds."""
-        mock_boto3.return_value = self.mock_s3
-        
-        # First call fails, second succeeds
-        mock_response_fail = Mock()
-        mock_response_fail.status_code = 500
-        mock_response_fail.headers = {}
-        mock_response_fail.raise_for_status.side_effect = Exception("Timeout")
-        
-        mock_response_success = Mock()
-        mock_response_success.status_code = 200
-        mock_response_success.text = '{"data": "test"}'
-        mock_response_success.headers = {'Content-Type': 'application/json'}
-        mock_response_success.raise_for_status = Mock()
-        
-        mock_get.side_effect = [mock_response_fail, mock_response_success]
-        
-        ingestor = IBGEIngestor("test-bucket", self.config_path)
-        
-        result = ingestor.fetch_with_retry("http://test.url")
-        
-        self.assertEqual(result, '{"data": "test"}')
-        self.assertEqual(mock_get.call_count, 2)
-        mock_sleep.assert_called_once()  # Should sleep before retry
+    ingestor = IBGEIngestor.from_dict("test-bucket", CONFIG_DATA)
     
-    @patch('src.ingestion.ibge_client.boto3.client')
-    @patch('src.ingestion.http_client.requests.get')
-    @patch('src.ingestion.http_client.time.sleep')
-    def test_fetch_with_retry_max_retries(self, mock_sleep, mock_get, mock_boto3):
-        """Test API fetch exhausts max retries."""
-        mock_boto3.return_value = self.mock_s3
-        
-        # All calls fail
-        mock_response = Mock()
-        mock_response.status_code = 500
-        mock_response.headers = {}
-        mock_response.raise_for_status.side_effect = Exception("Timeout")
-        mock_get.return_value = mock_response
-        
-        ingestor = IBGEIngestor("test-bucket", self.config_path)
-        
-        result = ingestor.fetch_with_retry("http://test.url")
-        
-        self.assertIsNone(result)
-        self.assertEqual(mock_get.call_count, 10)  # Now uses HTTPClient's default of 10
+    assert ingestor.fetch_with_retry("http://test.url") == '{"data": "test"}'
+    mock_get.assert_called_once()
+
+
+@patch('src.ingestion.http_client.time.sleep')
+@patch('src.ingestion.http_client.requests.get')
+def test_fetch_with_retry_eventual_success(mock_get, mock_sleep):
+    """Test API fetch with retry that eventually succeeds."""
+    # First call fails, second succeeds
+    mock_get.side_effect = [
+        _mk_response(500, exc=Exception("Timeout")),
+        _mk_response(text='{"data": "test"}')
+    ]
     
-    @patch('src.ingestion.ibge_client.boto3.client')
-    def test_log_source(self, mock_boto3):
-        """Test source logging functionality."""
-        mock_boto3.return_value = self.mock_s3
-        
-        ingestor = IBGEIngestor("test-bucket", self.config_path)
-        
-        # Log a source
-        ingestor.log_source("test_dataset", "http://test.url")
-        
-        # Verify log file was created and contains entry
-        self.assertTrue(ingestor.source_log.exists())
-        
-        with open(ingestor.source_log, 'r') as f:
-            content = f.read()
-            self.assertIn("test_dataset", content)
-            self.assertIn("http://test.url", content)
+    ingestor = IBGEIngestor.from_dict("test-bucket", CONFIG_DATA)
     
-    @patch('src.ingestion.ibge_client.boto3.client')
-    @patch('src.ingestion.http_client.requests.get')
-    def test_run_full_ingestion_skips_existing(self, mock_get, mock_boto3):
-        """Test that ingestion skips files that already exist with matching MD5."""
-        mock_boto3.return_value = self.mock_s3
-        
-        # Mock API response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        test_content = '[{"header": "test"}, {"data": "value"}]'
-        mock_response.text = test_content
-        mock_response.headers = {'Content-Type': 'application/json'}
-        mock_response.raise_for_status = Mock()
-        mock_get.return_value = mock_response
-        
-        ingestor = IBGEIngestor("test-bucket", self.config_path)
-        
-        # Calculate expected MD5
-        import hashlib
-        expected_md5 = hashlib.md5(test_content.encode('utf-8')).hexdigest()
-        
-        # Mock S3 to return matching ETag
-        self.mock_s3.head_object.return_value = {
-            'ETag': f'"{expected_md5}"'
-        }
-        
-        ingestor.run_full_ingestion()
-        
-        # put_object should NOT be called since files already exist
-        self.mock_s3.put_object.assert_not_called()
+    assert ingestor.fetch_with_retry("http://test.url") == '{"data": "test"}'
+    assert mock_get.call_count == 2
+    mock_sleep.assert_called_once()  # Should sleep before retry
+
+
+@patch('src.ingestion.http_client.time.sleep')
+@patch('src.ingestion.http_client.requests.get')
+def test_fetch_with_retry_max_retries(mock_get, mock_sleep):
+    """Test API fetch gives up after the configured number of attempts."""
+    # All calls fail
+    mock_get.return_value = _mk_response(500, exc=Exception("Timeout"))
+    
+    ingestor = IBGEIngestor.from_dict("test-bucket", CONFIG_DATA, max_retries=2)
+    
+    assert ingestor.fetch_with_retry("http://test.url") is None
+    assert mock_get.call_count == 2
+
+
+@patch('src.ingestion.http_client.time.sleep')
+@patch('src.ingestion.http_client.requests.get')
+def test_fetch_with_retry_default_max_retries(mock_get, mock_sleep):
+    """Test the default retry budget stays at 10 attempts."""
+    # A finite side_effect bounds the loop even if the retry budget regresses
+    mock_get.side_effect = [_mk_response(500, exc=Exception("Timeout"))] * 10
+    
+    ingestor = IBGEIngestor.from_dict("test-bucket", CONFIG_DATA)
+    
+    assert ingestor.fetch_with_retry("http://test.url") is None
+    assert mock_get.call_count == 10
+
+
+def test_log_source(tmp_path):
+    """Test source logging functionality."""
+    ingestor = IBGEIngestor.from_dict("test-bucket", CONFIG_DATA)
+    ingestor.source_log = tmp_path / "data_sources.log"
+    
+    # Log a source
+    ingestor.log_source("test_dataset", "http://test.url")
+    
+    # Verify log file was created and contains entry
+    assert ingestor.source_log.exists()
+    content = ingestor.source_log.read_text(encoding='utf-8')
+    assert "test_dataset" in content
+    assert "http://test.url" in content
+
+
+@patch('src.ingestion.http_client.requests.get')
+def test_run_full_ingestion_skips_existing(mock_get, mock_s3):
+    """Test that ingestion skips files that already exist with matching MD5."""
+    mock_get.return_value = _mk_response(text=_TEST_CONTENT)
+    
+    ingestor = IBGEIngestor.from_dict("test-bucket", CONFIG_DATA)
     
-    @patch('src.ingestion.ibge_client.boto3.client')
-    @patch('src.ingestion.http_client.requests.get')
-    def test_run_full_ingestion_invalid_json(self, mock_get, mock_boto3):
-        """Test handling of invalid JSON response."""
-        mock_boto3.return_value = self.mock_s3
-        
-        # Mock invalid JSON response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = "Not valid JSON"
-        mock_response.headers = {'Content-Type': 'text/plain'}
-        mock_response.raise_for_status = Mock()
-        mock_get.return_value = mock_response
-        
-        ingestor = IBGEIngestor("test-bucket", self.config_path)
-        ingestor.run_full_ingestion()
-        
-        # Should not attempt S3 upload for invalid JSON
-        self.mock_s3.put_object.assert_not_called()
-
-
-class TestIBGEIngestorIntegration(unittest.TestCase):
-    """Integration tests for IBGEIngestor (require network/AWS)."""
+    # One bucket listing reports both files with matching ETags
+    mock_s3.get_paginator.return_value.paginate.return_value = [
+        {'Contents': [
+            {'Key': 'bronze/ibge/test_pop.json', 'ETag': f'"{_EXPECTED_MD5}"'},
+            {'Key': 'bronze/ibge/test_pop_2022.json', 'ETag': f'"{_EXPECTED_MD5}"'}
+        ]}
+    ]
+    # Compare MD5s rather than short-circuiting on existence
+    ingestor.fast_skip_if_exists = False
+    
+    ingestor.run_full_ingestion()
+    
+    # put_object should NOT be called since files already exist
+    mock_s3.put_object.assert_not_called()
+    mock_s3.get_paginator.assert_called_once_with('list_objects_v2')
+    mock_s3.head_object.assert_not_called()
+
+
+@patch('src.ingestion.http_client.requests.get')
+def test_run_full_ingestion_invalid_json(mock_get, mock_s3):
+    """Test handling of invalid JSON response."""
+    mock_get.return_value = _mk_response(text="Not valid JSON", content_type='text/plain')
+    
+    ingestor = IBGEIngestor.from_dict("test-bucket", CONFIG_DATA)
+    ingestor.run_full_ingestion()
+    
+    # Should not attempt S3 upload for invalid JSON
+    mock_s3.put_object.assert_not_called()
+
+
+@patch('src.ingestion.http_client.requests.get')
+def test_run_full_ingestion_lands_every_dataset(mock_get, mock_s3, tmp_path):
+    """Test concurrent ingestion fetches and uploads each dataset exactly once."""
+    mock_get.return_value = _mk_response(text=_TEST_CONTENT)
+    mock_s3.get_paginator.return_value.paginate.return_value = [{}]
+    
+    config = {**CONFIG_DATA, "rate_limit": {"max_concurrent": 2}}
+    ingestor = IBGEIngestor.from_dict("test-bucket", config)
+    # Keep the run off the repo's source log and the on-disk HTTP and skip-marker caches
+    ingestor.source_log = tmp_path / "data_sources.log"
+    ingestor.http_client.enable_cache = False
+    ingestor.skip_cache = Mock(get=Mock(return_value=None))
+    
+    ingestor.run_full_ingestion()
+    
+    uploaded = sorted(call.kwargs['Key'] for call in mock_s3.put_object.call_args_list)
+    assert uploaded == ['bronze/ibge/test_pop.json', 'bronze/ibge/test_pop_2022.json']
+    
+    content = ingestor.source_log.read_text(encoding='utf-8')
+    assert content.count("Dataset: ") == len(config['datasets'])
+
+
+@pytest.mark.slow
+def test_real_api_call():
+    """Test actual API call to IBGE SIDRA (deselected by default; run with -m slow)."""
+    # Test with single municipality
+    url = "https://apisidra.ibge.gov.br/values/t/1378/n6/1100015/v/allxp/p/all?formato=json"
+    response = requests.get(url, timeout=30)
     
-    @unittest.skip("Integration test - requires network access")
-    def test_real_api_call(self):
-        """Test actual API call to IBGE SIDRA (skipped by default)."""
-        import requests
-        
-        # Test with single municipality
-        url = "https://apisidra.ibge.gov.br/values/t/1378/n6/1100015/v/allxp/p/all?formato=json"
-        response = requests.get(url, timeout=30)
-        
-        self.assertEqual(response.status_code, 200)
-        data = response.json()
-        self.assertIsInstance(data, list)
-        self.assertGreater(len(data), 0)
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data, list)
+    assert len(data) > 0
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    pytest.main([__file__, "-v"])
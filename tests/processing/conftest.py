@@ -0,0 +1,120 @@
+"""
+Shared fixtures for processing tests.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.processing import base_transformer
+from src.processing.gold_transformer import GoldTransformer
+
+
+GOLD_SCHEMA_CONFIG = {
+    "version": "1.0.0",
+    "schemas": {
+        "gold_municipality_socioeconomic": {
+            "columns": {
+                "municipality_code": {"type": "string"},
+                "municipality_name": {"type": "string"},
+                "state_code": {"type": "string"},
+                "state_name": {"type": "string"},
+                "region_code": {"type": "string"},
+                "region_name": {"type": "string"},
+                "population_2010": {"type": "integer", "nullable": True},
+                "population_2022": {"type": "integer", "nullable": True},
+                "population_change_pct": {"type": "float", "nullable": True}
+            }
+        },
+        "gold_state_summary": {
+            "columns": {
+                "state_code": {"type": "string"},
+                "state_name": {"type": "string"},
+                "region_code": {"type": "string"},
+                "region_name": {"type": "string"},
+                "municipality_count": {"type": "integer"},
+                "total_population_2022": {"type": "integer", "nullable": True},
+                "total_sanctions": {"type": "integer"}
+            }
+        },
+        "gold_sanctions_summary": {
+            "columns": {
+                "registry_type": {"type": "string"},
+                "total_sanctions": {"type": "integer"},
+                "sanctions_pf": {"type": "integer"},
+                "sanctions_pj": {"type": "integer"},
+                "pj_ratio_pct": {"type": "float"}
+            }
+        },
+        "gold_analysis_compliance": {
+            "columns": {
+                "state_code": {"type": "string"},
+                "state_name": {"type": "string"},
+                "n_municipalities": {"type": "integer"},
+                "population": {"type": "integer", "nullable": True},
+                "n_sanctions": {"type": "integer"},
+                "sanctions_per_100k": {"type": "float", "nullable": True},
+                "log_population": {"type": "float", "nullable": True}
+            }
+        }
+    },
+    "state_mapping": {
+        "11": "Rondônia",
+        "35": "São Paulo",
+        "33": "Rio de Janeiro"
+    },
+    "region_mapping": {
+        "1": {"name": "Norte", "states": ["11"]},
+        "2": {"name": "Nordeste", "states": []},
+        "3": {"name": "Sudeste", "states": ["33", "35"]},
+        "4": {"name": "Sul", "states": []},
+        "5": {"name": "Centro-Oeste", "states": []}
+    }
+}
+
+
+@pytest.fixture(scope="package", autouse=True)
+def stub_boto3_client():
+    """Stub boto3.client for the processing tests; every client built gets its own S3 mock."""
+    with patch('boto3.client', side_effect=lambda *args, **kwargs: MagicMock()) as mock_client:
+        yield mock_client
+
+
+@pytest.fixture(autouse=True)
+def clear_s3_client_cache():
+    """Drop cached S3 clients around each test so every transformer gets a fresh mock."""
+    base_transformer._S3_CLIENT_CACHE.clear()
+    yield
+    base_transformer._S3_CLIENT_CACHE.clear()
+
+
+def _write_schema_config(directory, config):
+    """Write a schema config dict as test_schema.json in directory; return its path."""
+    config_path = directory / "test_schema.json"
+    config_path.write_bytes(json.dumps(config).encode('utf-8'))
+    return str(config_path)
+
+
+@pytest.fixture
+def write_schema_config(tmp_path):
+    """Factory: write a schema config dict to this test's tmp_path and return its path."""
+    return lambda config: _write_schema_config(tmp_path, config)
+
+
+@pytest.fixture
+def mock_schema_config(request, write_schema_config):
+    """Write the test class's SCHEMA_CONFIG and return its path."""
+    return write_schema_config(request.cls.SCHEMA_CONFIG)
+
+
+@pytest.fixture(scope="package")
+def gold_schema_config(tmp_path_factory):
+    """Write the Gold schema config (union of all Gold test schemas) once per package run."""
+    return _write_schema_config(tmp_path_factory.mktemp("gold"), GOLD_SCHEMA_CONFIG)
+
+
+@pytest.fixture(scope="package")
+def gold_transformer(gold_schema_config):
+    """Create a single GoldTransformer (mocked S3) shared by the Gold tests."""
+    return GoldTransformer("test-bucket", gold_schema_config)
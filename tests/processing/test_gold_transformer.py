@@ -3,93 +3,43 @@ Unit tests for Gold layer transformer.
 """
 
 import pytest
-import json
 import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch, PropertyMock
 from datetime import datetime
 
 import pandas as pd
-import numpy as np
+
+# ln(10,000,000) rounded to 4 places, as written to log_population
+EXPECTED_LOG_10M = 16.1181
+
+
+def _run_gold_transform(transformer, method_name, silver_frames):
+    """
+    Run one Gold transform against in-memory Silver frames.
+    
+    :param transformer: GoldTransformer under test
+    :param method_name: Name of the _transform_* method to call
+    :param silver_frames: Dict of {SILVER_FILES key: DataFrame}; missing keys read as None
+    :return: DataFrame passed to _write_gold_parquet
+    """
+    frames_by_key = {transformer.SILVER_FILES[name]: df for name, df in silver_frames.items()}
+    written = []
+    with patch.object(transformer, '_should_skip_processing', return_value=(False, 'test')), \
+         patch.object(transformer, '_read_silver_parquet', side_effect=frames_by_key.get), \
+         patch.object(transformer, '_write_gold_parquet',
+                      side_effect=lambda df, key: written.append(df) or True), \
+         patch.object(transformer, '_write_gold_json', return_value=True), \
+         patch.object(transformer, '_save_silver_metadata'), \
+         patch.object(transformer, 'log_processing'):
+        assert getattr(transformer, method_name)()
+    return written[0]
 
 
 class TestGoldTransformer:
     """Tests for GoldTransformer."""
 
-    @pytest.fixture
-    def mock_schema_config(self, tmp_path):
-        """Create a temporary schema config file."""
-        config = {
-            "version": "1.0.0",
-            "schemas": {
-                "gold_municipality_socioeconomic": {
-                    "columns": {
-                        "municipality_code": {"type": "string"},
-                        "municipality_name": {"type": "string"},
-                        "state_code": {"type": "string"},
-                        "state_name": {"type": "string"},
-                        "region_code": {"type": "string"},
-                        "region_name": {"type": "string"},
-                        "population_2010": {"type": "integer", "nullable": True},
-                        "population_2022": {"type": "integer", "nullable": True},
-                        "population_change_pct": {"type": "float", "nullable": True}
-                    }
-                },
-                "gold_state_summary": {
-                    "columns": {
-                        "state_code": {"type": "string"},
-                        "state_name": {"type": "string"},
-                        "region_code": {"type": "string"},
-                        "region_name": {"type": "string"},
-                        "municipality_count": {"type": "integer"},
-                        "total_population_2022": {"type": "integer", "nullable": True},
-                        "total_sanctions": {"type": "integer"}
-                    }
-                },
-                "gold_sanctions_summary": {
-                    "columns": {
-                        "registry_type": {"type": "string"},
-                        "total_sanctions": {"type": "integer"},
-                        "sanctions_pf": {"type": "integer"},
-                        "sanctions_pj": {"type": "integer"},
-                        "pj_ratio_pct": {"type": "float"}
-                    }
-                },
-                "gold_analysis_compliance": {
-                    "columns": {
-                        "state_code": {"type": "string"},
-                        "state_name": {"type": "string"},
-                        "n_municipalities": {"type": "integer"},
-                        "population": {"type": "integer", "nullable": True},
-                        "n_sanctions": {"type": "integer"},
-                        "sanctions_per_100k": {"type": "float", "nullable": True}
-                    }
-                }
-            },
-            "state_mapping": {
-                "11": "Rondônia",
-                "35": "São Paulo",
-                "33": "Rio de Janeiro"
-            },
-            "region_mapping": {
-                "1": {"name": "Norte", "states": ["11"]},
-                "3": {"name": "Sudeste", "states": ["33", "35"]}
-            }
-        }
-        config_path = tmp_path / "test_schema.json"
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        return str(config_path)
-
-    @pytest.fixture
-    def transformer(self, mock_schema_config):
-        """Create a GoldTransformer instance for testing."""
-        from src.processing.gold_transformer import GoldTransformer
-        
-        with patch('boto3.client'):
-            return GoldTransformer("test-bucket", mock_schema_config)
-
-    def test_silver_files_defined(self, transformer):
+    def test_silver_files_defined(self, gold_transformer):
         """Test that all expected Silver files are defined."""
         expected_files = [
             'municipalities', 'population', 'sanitation',
@@ -97,72 +47,38 @@ class TestGoldTransformer:
         ]
         
         for file_key in expected_files:
-            assert file_key in transformer.SILVER_FILES, f"Missing {file_key}"
+            assert file_key in gold_transformer.SILVER_FILES, f"Missing {file_key}"
 
-    def test_get_source_datasets(self, transformer):
+    def test_get_source_datasets(self, gold_transformer):
         """Test source datasets list."""
-        datasets = transformer.get_source_datasets()
+        datasets = gold_transformer.get_source_datasets()
         assert len(datasets) == 7
         assert 'municipalities' in datasets
         assert 'sanctions' in datasets
 
-    def test_calculate_change_pct_valid(self, transformer):
-        """Test percentage change calculation with valid values."""
-        # 10% increase
-        result = transformer._calculate_change_pct(110, 100)
-        assert result == 10.0
-        
-        # 50% decrease
-        result = transformer._calculate_change_pct(50, 100)
-        assert result == -50.0
-        
-        # No change
-        result = transformer._calculate_change_pct(100, 100)
-        assert result == 0.0
-
-    def test_calculate_change_pct_invalid(self, transformer):
-        """Test percentage change calculation with invalid values."""
-        assert transformer._calculate_change_pct(100, 0) is None
-        assert transformer._calculate_change_pct(100, None) is None
-        assert transformer._calculate_change_pct(None, 100) is None
-        assert transformer._calculate_change_pct(100, float('nan')) is None
+    @pytest.mark.parametrize("new,old,expected", [
+        (110, 100, 10.0),          # 10% increase
+        (50, 100, -50.0),          # 50% decrease
+        (100, 100, 0.0),           # no change
+        (100, 0, None),            # zero baseline
+        (100, None, None),
+        (None, 100, None),
+        (100, float('nan'), None),
+    ])
+    def test_calculate_change_pct(self, gold_transformer, new, old, expected):
+        """Test percentage change calculation for valid and invalid inputs."""
+        result = gold_transformer._calculate_change_pct(new, old)
+        if expected is None:
+            assert result is None
+        else:
+            assert result == expected
 
 
 class TestGoldMunicipalitySocioeconomic:
     """Tests for municipality socioeconomic aggregation."""
 
-    @pytest.fixture
-    def mock_schema_config(self, tmp_path):
-        """Create a temporary schema config file."""
-        config = {
-            "version": "1.0.0",
-            "schemas": {
-                "gold_municipality_socioeconomic": {
-                    "columns": {
-                        "municipality_code": {"type": "string"},
-                        "municipality_name": {"type": "string"},
-                        "state_code": {"type": "string"},
-                        "population_2010": {"type": "integer", "nullable": True},
-                        "population_2022": {"type": "integer", "nullable": True},
-                        "population_change_pct": {"type": "float", "nullable": True}
-                    }
-                }
-            },
-            "state_mapping": {"35": "São Paulo"},
-            "region_mapping": {"3": {"name": "Sudeste", "states": ["35"]}}
-        }
-        config_path = tmp_path / "test_schema.json"
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        return str(config_path)
-
-    def test_population_change_calculation(self, mock_schema_config):
+    def test_population_change_calculation(self, gold_transformer):
         """Test that population change is calculated correctly."""
-        from src.processing.gold_transformer import GoldTransformer
-        
-        with patch('boto3.client'):
-            transformer = GoldTransformer("test-bucket", mock_schema_config)
-        
         # Mock data
         df_muni = pd.DataFrame({
             'municipality_code': ['3550308'],
@@ -180,40 +96,18 @@ class TestGoldMunicipalitySocioeconomic:
         })
         
         # Test the change calculation
-        pop_2010 = df_pop[df_pop['year'] == 2010]['total_population'].values[0]
-        pop_2022 = df_pop[df_pop['year'] == 2022]['total_population'].values[0]
+        pop_by_year = df_pop.set_index('year')['total_population']
+        pop_2010 = pop_by_year.at[2010]
+        pop_2022 = pop_by_year.at[2022]
         
-        change_pct = transformer._calculate_change_pct(pop_2022, pop_2010)
+        change_pct = gold_transformer._calculate_change_pct(pop_2022, pop_2010)
         assert change_pct == 20.0  # 20% increase
 
 
 class TestGoldStateSummary:
     """Tests for state summary aggregation."""
 
-    @pytest.fixture
-    def mock_schema_config(self, tmp_path):
-        """Create a temporary schema config file."""
-        config = {
-            "version": "1.0.0",
-            "schemas": {
-                "gold_state_summary": {
-                    "columns": {
-                        "state_code": {"type": "string"},
-                        "state_name": {"type": "string"},
-                        "municipality_count": {"type": "integer"},
-                        "total_sanctions": {"type": "integer"}
-                    }
-                }
-            },
-            "state_mapping": {"35": "São Paulo", "33": "Rio de Janeiro"},
-            "region_mapping": {"3": {"name": "Sudeste", "states": ["33", "35"]}}
-        }
-        config_path = tmp_path / "test_schema.json"
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        return str(config_path)
-
-    def test_municipality_count_aggregation(self, mock_schema_config):
+    def test_municipality_count_aggregation(self):
         """Test municipality count aggregation by state."""
         df_muni = pd.DataFrame({
             'municipality_code': ['3550308', '3304557', '3303500'],
@@ -224,118 +118,97 @@ class TestGoldStateSummary:
         # Group and count
         muni_counts = df_muni.groupby('state_code').size().reset_index(name='municipality_count')
         
-        assert muni_counts[muni_counts['state_code'] == '35']['municipality_count'].values[0] == 1
-        assert muni_counts[muni_counts['state_code'] == '33']['municipality_count'].values[0] == 2
+        by_state = muni_counts.set_index('state_code')
+        assert by_state.at['35', 'municipality_count'] == 1
+        assert by_state.at['33', 'municipality_count'] == 2
 
 
 class TestGoldSanctionsSummary:
     """Tests for sanctions summary aggregation."""
 
-    @pytest.fixture
-    def mock_schema_config(self, tmp_path):
-        """Create a temporary schema config file."""
-        config = {
-            "version": "1.0.0",
-            "schemas": {
-                "gold_sanctions_summary": {
-                    "columns": {
-                        "registry_type": {"type": "string"},
-                        "total_sanctions": {"type": "integer"},
-                        "sanctions_pf": {"type": "integer"},
-                        "sanctions_pj": {"type": "integer"},
-                        "pj_ratio_pct": {"type": "float"}
-                    }
-                }
-            },
-            "state_mapping": {"35": "São Paulo"},
-            "region_mapping": {"3": {"name": "Sudeste", "states": ["35"]}}
-        }
-        config_path = tmp_path / "test_schema.json"
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        return str(config_path)
-
-    def test_sanctions_aggregation_by_registry(self, mock_schema_config):
+    def test_sanctions_aggregation_by_registry(self):
         """Test sanctions aggregation by registry type."""
         df_sanctions = pd.DataFrame({
             'sanction_id': ['CEIS_001', 'CEIS_002', 'CNEP_001', 'CNEP_002', 'CNEP_003'],
             'registry_type': ['CEIS', 'CEIS', 'CNEP', 'CNEP', 'CNEP'],
             'entity_type': ['PF', 'PJ', 'PJ', 'PJ', 'PF'],
             'state_code': ['35', '35', '33', '33', '35']
-        })
+        }).astype({'registry_type': 'category', 'entity_type': 'category', 'state_code': 'category'})
         
-        # Aggregate by registry
-        registry_summary = df_sanctions.groupby('registry_type').agg(
+        # Aggregate by registry (int8 dummies, as in GoldTransformer)
+        df_sanctions['is_pf'] = df_sanctions['entity_type'].eq('PF').astype('int8')
+        df_sanctions['is_pj'] = df_sanctions['entity_type'].eq('PJ').astype('int8')
+        registry_summary = df_sanctions.groupby('registry_type', observed=True).agg(
             total_sanctions=('sanction_id', 'nunique'),
-            sanctions_pf=('entity_type', lambda x: (x == 'PF').sum()),
-            sanctions_pj=('entity_type', lambda x: (x == 'PJ').sum())
+            sanctions_pf=('is_pf', 'sum'),
+            sanctions_pj=('is_pj', 'sum')
         ).reset_index()
         
+        by_registry = registry_summary.set_index('registry_type')
+        
         # CEIS
-        ceis = registry_summary[registry_summary['registry_type'] == 'CEIS'].iloc[0]
+        ceis = by_registry.loc['CEIS']
         assert ceis['total_sanctions'] == 2
         assert ceis['sanctions_pf'] == 1
         assert ceis['sanctions_pj'] == 1
         
         # CNEP
-        cnep = registry_summary[registry_summary['registry_type'] == 'CNEP'].iloc[0]
+        cnep = by_registry.loc['CNEP']
         assert cnep['total_sanctions'] == 3
         assert cnep['sanctions_pf'] == 1
         assert cnep['sanctions_pj'] == 2
 
-    def test_pj_ratio_calculation(self, mock_schema_config):
-        """Test PJ ratio calculation."""
-        total = 10
-        pj_count = 7
+    def test_pj_ratio_calculation(self, gold_transformer):
+        """Test PJ ratio computed by the sanctions summary transform."""
+        df_sanctions = pd.DataFrame({
+            'sanction_id': [f'CEIS_{i:03d}' for i in range(10)],
+            'registry_type': ['CEIS'] * 10,
+            'entity_type': ['PJ'] * 7 + ['PF'] * 3,
+            'state_code': ['35'] * 10,
+            'sanctioning_agency': ['CGU'] * 10,
+            'sanction_start_date': pd.Timestamp('2024-01-01')
+        })
+        
+        result = _run_gold_transform(gold_transformer, '_transform_sanctions_summary',
+                                     {'sanctions': df_sanctions})
         
-        pj_ratio = round((pj_count / total) * 100, 2)
-        assert pj_ratio == 70.0
+        assert result.at[0, 'pj_ratio_pct'] == 70.0
 
 
 class TestGoldAnalysisCompliance:
     """Tests for analysis compliance dataset."""
 
-    @pytest.fixture
-    def mock_schema_config(self, tmp_path):
-        """Create a temporary schema config file."""
-        config = {
-            "version": "1.0.0",
-            "schemas": {
-                "gold_analysis_compliance": {
-                    "columns": {
-                        "state_code": {"type": "string"},
-                        "n_municipalities": {"type": "integer"},
-                        "population": {"type": "integer", "nullable": True},
-                        "n_sanctions": {"type": "integer"},
-                        "sanctions_per_100k": {"type": "float", "nullable": True},
-                        "log_population": {"type": "float", "nullable": True}
-                    }
-                }
-            },
-            "state_mapping": {"35": "São Paulo"},
-            "region_mapping": {"3": {"name": "Sudeste", "states": ["35"]}}
-        }
-        config_path = tmp_path / "test_schema.json"
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        return str(config_path)
-
-    def test_sanctions_per_100k_calculation(self, mock_schema_config):
-        """Test sanctions per 100k population calculation."""
-        population = 10000000  # 10 million
-        n_sanctions = 500
+    def test_derived_metrics(self, gold_transformer):
+        """Test sanctions per 100k and log population computed by the compliance transform."""
+        df_muni = pd.DataFrame({
+            'municipality_code': ['3550308'],
+            'state_code': ['35'],
+            'state_name': ['São Paulo'],
+            'region_code': ['3'],
+            'region_name': ['Sudeste']
+        })
+        df_pop = pd.DataFrame({
+            'municipality_code': ['3550308'],
+            'year': [2022],
+            'total_population': [10_000_000]  # 10 million
+        })
+        df_sanctions = pd.DataFrame({
+            'sanction_id': [f'CEIS_{i:03d}' for i in range(500)],
+            'registry_type': ['CEIS'] * 500,
+            'state_code': ['35'] * 500
+        })
         
-        sanctions_per_100k = round((n_sanctions / population) * 100000, 4)
-        assert sanctions_per_100k == 5.0  # 5 per 100k
-
-    def test_log_transformation(self, mock_schema_config):
-        """Test log transformation of population."""
-        population = 10000000  # 10 million
+        result = _run_gold_transform(gold_transformer, '_transform_analysis_compliance', {
+            'municipalities': df_muni,
+            'population': df_pop,
+            'sanctions': df_sanctions
+        })
         
-        log_pop = round(np.log(population), 4)
-        assert log_pop == round(np.log(10000000), 4)  # ~16.1181
+        by_state = result.set_index('state_code')
+        assert by_state.at['35', 'sanctions_per_100k'] == 5.0  # 5 per 100k
+        assert by_state.at['35', 'log_population'] == EXPECTED_LOG_10M
 
-    def test_region_dummy_variables(self, mock_schema_config):
+    def test_region_dummy_variables(self):
         """Test region dummy variable creation."""
         df = pd.DataFrame({
             'state_code': ['35', '33', '11'],
@@ -348,79 +221,24 @@ class TestGoldAnalysisCompliance:
         # Create dummy for Norte (region 1)
         df['is_norte'] = (df['region_code'] == '1').astype(int)
         
-        assert df[df['state_code'] == '35']['is_sudeste'].values[0] == 1
-        assert df[df['state_code'] == '35']['is_norte'].values[0] == 0
-        assert df[df['state_code'] == '11']['is_norte'].values[0] == 1
+        by_state = df.set_index('state_code')
+        assert by_state.at['35', 'is_sudeste'] == 1
+        assert by_state.at['35', 'is_norte'] == 0
+        assert by_state.at['11', 'is_norte'] == 1
 
 
 class TestGoldTransformerIntegration:
     """Integration tests for GoldTransformer (mocked S3)."""
 
-    @pytest.fixture
-    def mock_schema_config(self, tmp_path):
-        """Create a full schema config file."""
-        config = {
-            "version": "1.0.0",
-            "schemas": {
-                "gold_municipality_socioeconomic": {
-                    "columns": {
-                        "municipality_code": {"type": "string"},
-                        "population_2010": {"type": "integer", "nullable": True},
-                        "population_2022": {"type": "integer", "nullable": True}
-                    }
-                },
-                "gold_state_summary": {
-                    "columns": {
-                        "state_code": {"type": "string"},
-                        "total_sanctions": {"type": "integer"}
-                    }
-                },
-                "gold_sanctions_summary": {
-                    "columns": {
-                        "registry_type": {"type": "string"},
-                        "total_sanctions": {"type": "integer"}
-                    }
-                },
-                "gold_analysis_compliance": {
-                    "columns": {
-                        "state_code": {"type": "string"},
-                        "n_sanctions": {"type": "integer"}
-                    }
-                }
-            },
-            "state_mapping": {"35": "São Paulo", "33": "Rio de Janeiro"},
-            "region_mapping": {
-                "1": {"name": "Norte", "states": []},
-                "2": {"name": "Nordeste", "states": []},
-                "3": {"name": "Sudeste", "states": ["33", "35"]},
-                "4": {"name": "Sul", "states": []},
-                "5": {"name": "Centro-Oeste", "states": []}
-            }
-        }
-        config_path = tmp_path / "test_schema.json"
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        return str(config_path)
-
-    def test_transformer_initialization(self, mock_schema_config):
+    def test_transformer_initialization(self, gold_transformer):
         """Test transformer initializes correctly."""
-        from src.processing.gold_transformer import GoldTransformer
-        
-        with patch('boto3.client'):
-            transformer = GoldTransformer("test-bucket", mock_schema_config)
-        
-        assert transformer.bucket == "test-bucket"
-        assert len(transformer.SILVER_FILES) == 7
+        assert gold_transformer.bucket == "test-bucket"
+        assert len(gold_transformer.SILVER_FILES) == 7
 
-    def test_transform_method_exists(self, mock_schema_config):
+    def test_transform_method_exists(self, gold_transformer):
         """Test transform method is implemented."""
-        from src.processing.gold_transformer import GoldTransformer
-        
-        with patch('boto3.client'):
-            transformer = GoldTransformer("test-bucket", mock_schema_config)
-        
-        assert hasattr(transformer, 'transform')
-        assert callable(transformer.transform)
+        assert hasattr(gold_transformer, 'transform')
+        assert callable(gold_transformer.transform)
 
 
 if __name__ == "__main__":
@@ -5,7 +5,7 @@ Unit tests for smart caching functionality in Silver layer transformers.
 import pytest
 import json
 from pathlib import Path
-from unittest.mock import MagicMock, patch, call
+from unittest.mock import MagicMock, call
 from botocore.exceptions import ClientError
 
 import pandas as pd
@@ -14,26 +14,19 @@ import pandas as pd
 class TestSmartCaching:
     """Tests for smart caching and metadata tracking."""
 
-    @pytest.fixture
-    def mock_schema_config(self, tmp_path):
-        """Create a temporary schema config file."""
-        config = {
-            "version": "1.0.0",
-            "schemas": {
-                "test_schema": {
-                    "columns": {
-                        "id": {"type": "string"},
-                        "value": {"type": "integer"}
-                    }
+    SCHEMA_CONFIG = {
+        "version": "1.0.0",
+        "schemas": {
+            "test_schema": {
+                "columns": {
+                    "id": {"type": "string"},
+                    "value": {"type": "integer"}
                 }
-            },
-            "state_mapping": {"35": "São Paulo"},
-            "region_mapping": {"3": {"name": "Sudeste", "states": ["35"]}}
-        }
-        config_path = tmp_path / "test_schema.json"
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        return str(config_path)
+            }
+        },
+        "state_mapping": {"35": "São Paulo"},
+        "region_mapping": {"3": {"name": "Sudeste", "states": ["35"]}}
+    }
 
     @pytest.fixture
     def transformer(self, mock_schema_config):
@@ -46,12 +39,7 @@ class TestSmartCaching:
             def get_source_datasets(self):
                 return []
         
-        with patch('boto3.client') as mock_boto:
-            mock_s3 = MagicMock()
-            mock_boto.return_value = mock_s3
-            transformer = ConcreteTransformer("test-bucket", mock_schema_config)
-            transformer.s3 = mock_s3
-            return transformer
+        return ConcreteTransformer("test-bucket", mock_schema_config)
 
     def test_get_bronze_file_hash_exists(self, transformer):
         """Test getting MD5 hash from existing bronze file."""
@@ -67,6 +55,91 @@ class TestSmartCaching:
             Key='bronze/test/file.json'
         )
 
+    def test_get_bronze_file_hash_memoized(self, transformer):
+        """Test repeated hash lookups reuse the first HeadObject response."""
+        transformer.s3.head_object.return_value = {
+            'ETag': '"abc123def456"'
+        }
+
+        first = transformer._get_bronze_file_hash('bronze/test/file.json')
+        second = transformer._get_bronze_file_hash('bronze/test/file.json')
+
+        assert first == second == "abc123def456"
+        transformer.s3.head_object.assert_called_once()
+
+    def test_build_metadata(self, transformer):
+        """Test metadata records hashes of existing sources only."""
+        def head_object_side_effect(Bucket, Key):
+            if Key == 'bronze/test/file1.json':
+                return {'ETag': '"hash1"'}
+            raise ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+
+        transformer.s3.head_object.side_effect = head_object_side_effect
+
+        metadata = transformer._build_metadata(
+            'silver/test/data.parquet',
+            ['bronze/test/file1.json', 'bronze/test/missing.json'],
+            42,
+            files_processed=1
+        )
+
+        assert metadata['output_file'] == 'silver/test/data.parquet'
+        assert metadata['source_files'] == {'bronze/test/file1.json': 'hash1'}
+        assert metadata['record_count'] == 42
+        assert metadata['files_processed'] == 1
+        assert 'processed_at' in metadata
+
+    def test_get_bronze_file_hashes(self, transformer):
+        """Test batch hash lookup reuses cached ETags and reports missing files."""
+        def head_object_side_effect(Bucket, Key):
+            if Key == 'bronze/test/file2.json':
+                return {'ETag': '"hash2"'}
+            raise ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+
+        transformer.s3.head_object.side_effect = head_object_side_effect
+        transformer._bronze_hash_cache['bronze/test/file1.json'] = 'hash1'
+
+        result = transformer._get_bronze_file_hashes(
+            ['bronze/test/file1.json', 'bronze/test/file2.json', 'bronze/test/missing.json']
+        )
+
+        assert result == {
+            'bronze/test/file1.json': 'hash1',
+            'bronze/test/file2.json': 'hash2',
+            'bronze/test/missing.json': None
+        }
+        assert transformer.s3.head_object.call_count == 2
+
+    def test_get_bronze_file_hashes_from_listing(self, transformer):
+        """Test batch hash lookup lists the shared prefix once instead of heading each file."""
+        transformer.s3.get_paginator.return_value.paginate.return_value = [
+            {'Contents': [
+                {'Key': 'bronze/test/file1.json', 'ETag': '"hash1"'},
+                {'Key': 'bronze/test/file2.json', 'ETag': '"hash2"'}
+            ]}
+        ]
+        transformer.s3.head_object.side_effect = ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+
+        keys = ['bronze/test/file1.json', 'bronze/test/file2.json', 'bronze/test/missing.json']
+        result = transformer._get_bronze_file_hashes(keys)
+
+        assert result == {
+            'bronze/test/file1.json': 'hash1',
+            'bronze/test/file2.json': 'hash2',
+            'bronze/test/missing.json': None
+        }
+        transformer.s3.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket='test-bucket', Prefix='bronze/test/'
+        )
+        # Only the key the listing did not cover falls back to HeadObject
+        transformer.s3.head_object.assert_called_once_with(
+            Bucket='test-bucket', Key='bronze/test/missing.json'
+        )
+
+        # A second lookup reuses the listing
+        transformer._get_bronze_file_hashes(keys)
+        transformer.s3.get_paginator.return_value.paginate.assert_called_once()
+
     def test_get_bronze_file_hash_not_found(self, transformer):
         """Test getting hash for non-existent file."""
         transformer.s3.head_object.side_effect = ClientError(
@@ -90,6 +163,7 @@ class TestSmartCaching:
         
         # Test save
         transformer._save_silver_metadata('silver/test/.metadata.json', metadata)
+        assert transformer.flush_metadata_writes() is True
         
         transformer.s3.put_object.assert_called_once()
         call_args = transformer.s3.put_object.call_args
@@ -98,9 +172,21 @@ class TestSmartCaching:
         assert call_args[1]['ContentType'] == 'application/json; charset=utf-8'
         
         # Verify saved content
-        saved_content = json.loads(call_args[1]['Body'].decode('utf-8'))
+        saved_content = json.loads(call_args[1]['Body'])
         assert saved_content == metadata
 
+    def test_flush_metadata_writes_failure(self, transformer):
+        """Test a failed background metadata PUT is reported and evicted from the cache."""
+        transformer.s3.put_object.side_effect = ClientError(
+            {'Error': {'Code': 'InternalError'}}, 'PutObject'
+        )
+        
+        transformer._save_silver_metadata('silver/test/.metadata.json', {'record_count': 1})
+        
+        assert transformer.flush_metadata_writes() is False
+        assert 'silver/test/.metadata.json' not in transformer._silver_metadata_cache
+        assert transformer.flush_metadata_writes() is True
+
     def test_get_silver_metadata_exists(self, transformer):
         """Test retrieving existing silver metadata."""
         metadata = {
@@ -127,6 +213,25 @@ class TestSmartCaching:
         
         assert result is None
 
+    def test_get_silver_metadata_memoized(self, transformer):
+        """Test metadata is fetched once per run and refreshed by saves."""
+        metadata = {'source_files': {}, 'record_count': 1}
+        transformer.s3.get_object.return_value = {
+            'Body': MagicMock(read=lambda: json.dumps(metadata).encode('utf-8'))
+        }
+        
+        transformer._get_silver_metadata('silver/test/.metadata.json')
+        result = transformer._get_silver_metadata('silver/test/.metadata.json')
+        
+        assert result == metadata
+        assert transformer.s3.get_object.call_count == 1
+        
+        updated = {'source_files': {}, 'record_count': 2}
+        transformer._save_silver_metadata('silver/test/.metadata.json', updated)
+        
+        assert transformer._get_silver_metadata('silver/test/.metadata.json') == updated
+        assert transformer.s3.get_object.call_count == 1
+
     def test_check_sources_changed_no_metadata(self, transformer):
         """Test source change detection with no existing metadata (first run)."""
         transformer.s3.get_object.side_effect = ClientError(
@@ -208,6 +313,25 @@ class TestSmartCaching:
         assert 'bronze/test/file1.json' in changed_files
         assert 'bronze/test/file2.json' not in changed_files
 
+    def test_check_sources_changed_tracked_file_removed(self, transformer):
+        """Test a tracked file that no longer exists does not count as a change."""
+        transformer._silver_metadata_cache['silver/test/.metadata.json'] = {
+            'source_files': {
+                'bronze/test/file1.json': 'hash1',
+                'bronze/test/file2.json': 'hash2'
+            }
+        }
+        transformer._bronze_hash_cache['bronze/test/file1.json'] = 'hash1'
+        transformer.s3.head_object.side_effect = ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+        
+        has_changes, changed_files = transformer._check_sources_changed(
+            'silver/test/.metadata.json',
+            ['bronze/test/file1.json', 'bronze/test/file2.json']
+        )
+        
+        assert has_changes is False
+        assert changed_files == []
+
     def test_check_sources_changed_new_file(self, transformer):
         """Test source change detection when a new file appears."""
         metadata = {
@@ -243,31 +367,19 @@ class TestSmartCaching:
 class TestTransparencySmartCaching:
     """Tests for smart caching in TransparencyTransformer."""
 
-    @pytest.fixture
-    def mock_schema_config(self, tmp_path):
-        """Create a temporary schema config file."""
-        config = {
-            "version": "1.0.0",
-            "schemas": {},
-            "state_mapping": {"35": "São Paulo"},
-            "region_mapping": {"3": {"name": "Sudeste", "states": ["35"]}}
-        }
-        config_path = tmp_path / "test_schema.json"
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        return str(config_path)
+    SCHEMA_CONFIG = {
+        "version": "1.0.0",
+        "schemas": {},
+        "state_mapping": {"35": "São Paulo"},
+        "region_mapping": {"3": {"name": "Sudeste", "states": ["35"]}}
+    }
 
     @pytest.fixture
     def transformer(self, mock_schema_config):
         """Create TransparencyTransformer for testing."""
         from src.processing.transparency_transformer import TransparencyTransformer
         
-        with patch('boto3.client') as mock_boto:
-            mock_s3 = MagicMock()
-            mock_boto.return_value = mock_s3
-            transformer = TransparencyTransformer("test-bucket", mock_schema_config)
-            transformer.s3 = mock_s3
-            return transformer
+        return TransparencyTransformer("test-bucket", mock_schema_config)
 
     def test_should_skip_processing_no_output(self, transformer):
         """Test skip check when output doesn't exist."""
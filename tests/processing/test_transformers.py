@@ -3,45 +3,64 @@ Unit tests for Silver layer transformers.
 """
 
 import pytest
+import io
 import json
 import tempfile
+import zlib
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
 
 
+def _fake_s3(bronze_files, written):
+    """Build an S3 mock that serves bronze JSON and captures uploaded objects."""
+    from botocore.exceptions import ClientError
+
+    def get_object(Bucket, Key):
+        if Key not in bronze_files:
+            raise ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
+        return {'Body': io.BytesIO(json.dumps(bronze_files[Key]).encode())}
+
+    def put_object(Bucket, Key, Body, **kwargs):
+        written[Key] = Body
+
+    def upload_fileobj(Fileobj, Bucket, Key, **kwargs):
+        written[Key] = Fileobj.read()
+
+    s3 = MagicMock()
+    s3.get_object.side_effect = get_object
+    s3.put_object.side_effect = put_object
+    s3.upload_fileobj.side_effect = upload_fileobj
+    s3.head_object.return_value = {'ETag': '"etag"'}
+    return s3
+
+
 class TestBaseTransformer:
     """Tests for BaseTransformer utility methods."""
 
-    @pytest.fixture
-    def mock_schema_config(self, tmp_path):
-        """Create a temporary schema config file."""
-        config = {
-            "version": "1.0.0",
-            "schemas": {
-                "test_schema": {
-                    "columns": {
-                        "id": {"type": "string"},
-                        "value": {"type": "integer"},
-                        "rate": {"type": "float", "nullable": True}
-                    }
+    SCHEMA_CONFIG = {
+        "version": "1.0.0",
+        "schemas": {
+            "test_schema": {
+                "columns": {
+                    "id": {"type": "string"},
+                    "value": {"type": "integer"},
+                    "rate": {"type": "float", "nullable": True},
+                    "state_name": {"type": "string", "categorical": True, "nullable": True}
                 }
-            },
-            "state_mapping": {
-                "11": "Rondônia",
-                "35": "São Paulo",
-                "33": "Rio de Janeiro"
-            },
-            "region_mapping": {
-                "1": {"name": "Norte", "states": ["11"]},
-                "3": {"name": "Sudeste", "states": ["33", "35"]}
             }
+        },
+        "state_mapping": {
+            "11": "Rondônia",
+            "35": "São Paulo",
+            "33": "Rio de Janeiro"
+        },
+        "region_mapping": {
+            "1": {"name": "Norte", "states": ["11"]},
+            "3": {"name": "Sudeste", "states": ["33", "35"]}
         }
-        config_path = tmp_path / "test_schema.json"
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        return str(config_path)
+    }
 
     @pytest.fixture
     def transformer(self, mock_schema_config):
@@ -54,8 +73,26 @@ class TestBaseTransformer:
             def get_source_datasets(self):
                 return []
         
-        with patch('boto3.client'):
-            return ConcreteTransformer("test-bucket", mock_schema_config)
+        return ConcreteTransformer("test-bucket", mock_schema_config)
+
+    def test_s3_client_shared(self, transformer, mock_schema_config):
+        """Test transformers built in the same process reuse one S3 client."""
+        other = type(transformer)("test-bucket", mock_schema_config)
+        assert other.s3 is transformer.s3
+
+    def test_schema_config_shared(self, transformer, mock_schema_config):
+        """Test transformers built from the same config path share one parsed config."""
+        other = type(transformer)("test-bucket", mock_schema_config)
+        assert other.schema_config is transformer.schema_config
+        assert transformer.schema_config['state_mapping']['35'] == "São Paulo"
+
+        # The shared config is frozen all the way down
+        with pytest.raises(TypeError):
+            transformer.state_mapping['35'] = "Changed"
+        with pytest.raises(TypeError):
+            transformer.region_mapping['3']['name'] = "Changed"
+        assert other.state_mapping['35'] == "São Paulo"
+        assert other.region_mapping['3']['states'] == ("33", "35")
 
     def test_extract_municipality_code_valid(self, transformer):
         """Test valid municipality code extraction."""
@@ -75,6 +112,32 @@ class TestBaseTransformer:
         """Test municipality code with decimal."""
         assert transformer._extract_municipality_code("3550308.0") == "3550308"
 
+    def test_extract_municipality_codes_vectorized(self, transformer):
+        """Test Arrow municipality code extraction matches the scalar version."""
+        import pyarrow as pa
+
+        raw = ["3550308", " 3304557 ", "3550308.0", "123", "9900001", None, ""]
+        result = transformer._extract_municipality_codes(pa.array(raw, type=pa.string()))
+
+        assert result.to_pylist() == [transformer._extract_municipality_code(c) for c in raw]
+
+    def test_extract_municipality_codes_bulk(self, transformer):
+        """Test Arrow extraction over 10k mixed codes matches the scalar version."""
+        import numpy as np
+        import pyarrow as pa
+
+        rng = np.random.default_rng(0)
+        prefixes = rng.choice(['11', '33', '35', '99'], size=10_000)
+        suffixes = rng.integers(0, 100_000, size=10_000)
+        raw = [f"{p}{s:05d}" for p, s in zip(prefixes, suffixes)]
+        raw[::7] = [f"{code}.0" for code in raw[::7]]
+        raw[::11] = [code[:6] for code in raw[::11]]
+
+        result = transformer._extract_municipality_codes(pa.array(raw, type=pa.string()))
+
+        assert result.to_pylist() == [transformer._extract_municipality_code(c) for c in raw]
+        assert result.null_count > 0
+
     def test_extract_state_code(self, transformer):
         """Test state code extraction from municipality code."""
         assert transformer._extract_state_code("3550308") == "35"
@@ -110,6 +173,18 @@ class TestBaseTransformer:
         assert transformer._safe_float("-") is None
         assert transformer._safe_float(None) is None
 
+    def test_to_numeric_series(self, transformer):
+        """Test vectorized numeric conversion matches the scalar helpers."""
+        raw = ["123", "1,234", "12.7", "", "-", None, "abc"]
+
+        ints = transformer._to_numeric_series(raw, integer=True)
+        floats = transformer._to_numeric_series(["123,45", "67.89", "-", None], integer=False)
+
+        assert [None if pd.isna(v) else v for v in ints] == [transformer._safe_int(v) for v in raw]
+        assert floats.iloc[0] == 123.45
+        assert floats.iloc[1] == 67.89
+        assert floats.iloc[2:].isna().all()
+
     def test_parse_date(self, transformer):
         """Test date parsing."""
         from datetime import datetime
@@ -123,74 +198,124 @@ class TestBaseTransformer:
         assert transformer._parse_date("") is None
         assert transformer._parse_date(None) is None
         assert transformer._parse_date("invalid") is None
+        assert transformer._parse_date("31/02/2022") is None
+        assert transformer._parse_date("1/2/2022") == datetime(2022, 2, 1)
+
+    def test_to_datetime_series(self, transformer):
+        """Test vectorized date parsing matches _parse_date."""
+        values = ["2022-01-15", "15/01/2022", "2022-01-15T10:30:00", " 01/02/2020 ", "", None, "invalid",
+                  "-2020-01-15"]
+        
+        result = transformer._to_datetime_series(values)
+        
+        expected = [transformer._parse_date(v) for v in values]
+        assert [None if pd.isna(r) else r.to_pydatetime() for r in result] == expected
 
     def test_validate_schema(self, transformer):
         """Test schema validation and enforcement."""
         df = pd.DataFrame({
             'id': ['A', 'B', 'C'],
             'value': ['1', '2', '3'],
+            'state_name': ['São Paulo', 'São Paulo', None],
             'extra_col': [1, 2, 3]
         })
         
         result = transformer.validate_schema(df, 'test_schema')
         
         # Should only have defined columns
-        assert list(result.columns) == ['id', 'value', 'rate']
+        assert list(result.columns) == ['id', 'value', 'rate', 'state_name']
         # Should have converted types
         assert result['value'].dtype == 'Int64'
+        assert isinstance(result['state_name'].dtype, pd.CategoricalDtype)
+        assert list(result['state_name'].cat.categories) == ['São Paulo']
+        assert result['state_name'].isna().tolist() == [False, False, True]
         # Nullable column should exist with nulls
         assert result['rate'].isna().all()
 
+    def test_write_silver_parquet(self, transformer):
+        """Test Parquet is serialized in memory with the zstd defaults and uploaded via multipart config."""
+        import pyarrow.parquet as pq
+
+        written = {}
+        transformer.s3 = _fake_s3({}, written)
+        df = pd.DataFrame({
+            'code': pd.Categorical(['3550308', '3304557']),
+            'rate': [0.5, 0.25],
+        })
+
+        assert transformer._write_silver_parquet(df, 'silver/test/data.parquet',
+                                                 use_byte_stream_split=['rate'])
+        upload_kwargs = transformer.s3.upload_fileobj.call_args.kwargs
+        assert upload_kwargs['Config'] is transformer.PARQUET_UPLOAD_CONFIG
+
+        parquet_file = pq.ParquetFile(io.BytesIO(written['silver/test/data.parquet']))
+        column_meta = parquet_file.metadata.row_group(0).column(1)
+        assert column_meta.compression == 'ZSTD'
+        assert 'BYTE_STREAM_SPLIT' in column_meta.encodings
+        result = parquet_file.read().to_pandas()
+        assert result['code'].dtype == 'category'
+        assert result['rate'].tolist() == [0.5, 0.25]
+
+    def test_write_silver_parquet_partition_row_groups(self, transformer):
+        """Test partition columns split the file into per-value row groups."""
+        import pyarrow.parquet as pq
+
+        written = {}
+        transformer.s3 = _fake_s3({}, written)
+        df = pd.DataFrame({'year': [2013, 2013, 2014, 2015], 'value': [1.0, 2.0, 3.0, 4.0]})
+
+        assert transformer._write_silver_parquet(df, 'silver/test/data.parquet', partition_cols=['year'])
+
+        data = io.BytesIO(written['silver/test/data.parquet'])
+        metadata = pq.ParquetFile(data).metadata
+        assert metadata.num_row_groups == 3
+        year_stats = [metadata.row_group(i).column(0).statistics for i in range(3)]
+        assert [(st.min, st.max) for st in year_stats] == [(2013, 2013), (2014, 2014), (2015, 2015)]
+        filtered = pd.read_parquet(data, filters=[('year', '=', 2014)])
+        assert filtered['value'].tolist() == [3.0]
+
 
 class TestIBGETransformer:
     """Tests for IBGETransformer."""
 
-    @pytest.fixture
-    def mock_schema_config(self, tmp_path):
-        """Create a temporary schema config file."""
-        config = {
-            "version": "1.0.0",
-            "schemas": {
-                "municipalities": {
-                    "columns": {
-                        "municipality_code": {"type": "string"},
-                        "municipality_name": {"type": "string"},
-                        "state_code": {"type": "string"},
-                        "state_name": {"type": "string"},
-                        "region_code": {"type": "string"},
-                        "region_name": {"type": "string"}
-                    }
-                },
-                "census_population": {
-                    "columns": {
-                        "municipality_code": {"type": "string"},
-                        "year": {"type": "integer"},
-                        "total_population": {"type": "integer"},
-                        "urban_population": {"type": "integer", "nullable": True},
-                        "rural_population": {"type": "integer", "nullable": True}
-                    }
+    SCHEMA_CONFIG = {
+        "version": "1.0.0",
+        "schemas": {
+            "municipalities": {
+                "columns": {
+                    "municipality_code": {"type": "string"},
+                    "municipality_name": {"type": "string"},
+                    "state_code": {"type": "string"},
+                    "state_name": {"type": "string"},
+                    "region_code": {"type": "string"},
+                    "region_name": {"type": "string"}
                 }
             },
-            "state_mapping": {
-                "11": "Rondônia",
-                "35": "São Paulo"
-            },
-            "region_mapping": {
-                "1": {"name": "Norte", "states": ["11"]},
-                "3": {"name": "Sudeste", "states": ["35"]}
+            "census_population": {
+                "columns": {
+                    "municipality_code": {"type": "string"},
+                    "year": {"type": "integer"},
+                    "total_population": {"type": "integer"},
+                    "urban_population": {"type": "integer", "nullable": True},
+                    "rural_population": {"type": "integer", "nullable": True}
+                }
             }
+        },
+        "state_mapping": {
+            "11": "Rondônia",
+            "35": "São Paulo"
+        },
+        "region_mapping": {
+            "1": {"name": "Norte", "states": ["11"]},
+            "3": {"name": "Sudeste", "states": ["35"]}
         }
-        config_path = tmp_path / "test_schema.json"
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        return str(config_path)
+    }
 
     def test_bronze_files_defined(self, mock_schema_config):
         """Test that all expected Bronze files are defined."""
         from src.processing.ibge_transformer import IBGETransformer
         
-        with patch('boto3.client'):
-            transformer = IBGETransformer("test-bucket", mock_schema_config)
+        transformer = IBGETransformer("test-bucket", mock_schema_config)
         
         expected_files = [
             'pop_2010', 'pop_2022',
@@ -206,49 +331,151 @@ class TestIBGETransformer:
         """Test source datasets list."""
         from src.processing.ibge_transformer import IBGETransformer
         
-        with patch('boto3.client'):
-            transformer = IBGETransformer("test-bucket", mock_schema_config)
+        transformer = IBGETransformer("test-bucket", mock_schema_config)
         
         datasets = transformer.get_source_datasets()
         assert len(datasets) == 8
         assert 'pop_2010' in datasets
         assert 'income_2022' in datasets
 
+    def test_fact_specs_reference_bronze_files(self, mock_schema_config):
+        """Test each Silver table spec only lists its own Bronze sources."""
+        from src.processing.ibge_transformer import IBGETransformer
+        
+        transformer = IBGETransformer("test-bucket", mock_schema_config)
+        
+        bronze_keys = set(transformer.BRONZE_FILES.values())
+        for name, spec in transformer._FACT_SPECS.items():
+            assert len(spec['source_keys']) == 2, name
+            assert set(spec['source_keys']) <= bronze_keys, name
+            assert spec['output_key'].endswith('/data.parquet'), name
+
+    def test_sidra_numeric_values(self, mock_schema_config):
+        """Test JSON numbers in SIDRA string fields are read like their string form."""
+        from src.processing.ibge_transformer import IBGETransformer
+
+        rows = [
+            {"D1C": "Município (Código)", "D1N": "Município", "V": "Valor"},
+            {"D1C": 3550308, "D1N": "São Paulo - SP", "V": 11253503},
+            {"D1C": "3509502", "D1N": "Campinas - SP", "V": "1080113"},
+        ]
+
+        transformer = IBGETransformer("test-bucket", mock_schema_config)
+        transformer.s3 = MagicMock()
+        transformer.s3.get_object.return_value = {
+            'Body': MagicMock(read=lambda: json.dumps(rows).encode('utf-8'))
+        }
+
+        table = transformer._read_sidra_table(transformer.BRONZE_FILES['pop_2010'])
+
+        assert table['municipality_code'].to_pylist() == ['3550308', '3509502']
+        assert table['value'].to_pylist() == ['11253503', '1080113']
+
+    def test_population_bronze_read_once(self, mock_schema_config):
+        """Test dim_municipalities and fact_population share parsed SIDRA tables."""
+        from src.processing.ibge_transformer import IBGETransformer
+
+        rows = [
+            {"D1C": "Município (Código)", "D1N": "Município", "V": "Valor"},
+            {"D1C": "3550308", "D1N": "São Paulo - SP", "V": "11253503"},
+            {"D1C": "1100015", "D1N": "Alta Floresta D'Oeste - RO", "V": "-"},
+        ]
+
+        transformer = IBGETransformer("test-bucket", mock_schema_config)
+        transformer.s3 = MagicMock()
+        transformer.s3.get_object.side_effect = lambda Bucket, Key: {
+            'Body': MagicMock(read=lambda: json.dumps(rows).encode('utf-8'))
+        }
+        transformer._should_skip_processing = MagicMock(return_value=(False, "forced"))
+        transformer._write_silver_parquet = MagicMock(return_value=True)
+        transformer._write_silver_json = MagicMock(return_value=True)
+        transformer._save_silver_metadata = MagicMock()
+        transformer.log_processing = MagicMock()
+
+        assert transformer._transform_municipalities()
+        assert transformer._transform_population()
+
+        read_keys = [c.kwargs['Key'] for c in transformer.s3.get_object.call_args_list]
+        assert sorted(read_keys) == sorted(transformer._FACT_SPECS['population']['source_keys'])
+
+        df_pop = transformer._write_silver_parquet.call_args_list[-1].args[0]
+        assert df_pop['municipality_code'].tolist() == ['3550308', '3550308']
+        assert df_pop['total_population'].tolist() == [11253503, 11253503]
+
+    def test_literacy_value_column_by_year(self, mock_schema_config):
+        """Test literacy maps 2010 counts and 2022 rates to their own columns."""
+        from src.processing.ibge_transformer import IBGETransformer
+
+        header = {"D1C": "Município (Código)", "D1N": "Município", "V": "Valor"}
+        values = {
+            IBGETransformer.BRONZE_FILES['literacy_2010']: "150000",
+            IBGETransformer.BRONZE_FILES['literacy_2022']: "97,5",
+        }
+
+        transformer = IBGETransformer("test-bucket", mock_schema_config)
+        transformer.s3 = MagicMock()
+        transformer.s3.get_object.side_effect = lambda Bucket, Key: {
+            'Body': MagicMock(read=lambda: json.dumps(
+                [header, {"D1C": "3550308", "D1N": "São Paulo - SP", "V": values[Key]}]).encode('utf-8'))
+        }
+        transformer._should_skip_processing = MagicMock(return_value=(False, "forced"))
+        transformer._write_silver_parquet = MagicMock(return_value=True)
+        transformer._write_silver_json = MagicMock(return_value=True)
+        transformer._save_silver_metadata = MagicMock()
+        transformer.log_processing = MagicMock()
+
+        assert transformer._transform_literacy()
+
+        df = transformer._write_silver_parquet.call_args.args[0]
+        assert df['year'].tolist() == [2010, 2022]
+        assert df['population_15_plus'].tolist() == [150000, pd.NA]
+        assert df['literacy_rate'].isna().tolist() == [True, False]
+        assert df['literacy_rate'].iloc[1] == 97.5
+        assert transformer._write_silver_parquet.call_args.kwargs['use_byte_stream_split'] == ['literacy_rate']
+
+    def test_fact_fails_fast_on_missing_year(self, mock_schema_config):
+        """Test a missing first census year aborts before reading the next one."""
+        from src.processing.ibge_transformer import IBGETransformer
+
+        transformer = IBGETransformer("test-bucket", mock_schema_config)
+        transformer._should_skip_processing = MagicMock(return_value=(False, "forced"))
+        transformer._read_sidra_table = MagicMock(return_value=None)
+        transformer._write_silver_parquet = MagicMock()
+        transformer.log_processing = MagicMock()
+
+        assert transformer._transform_population() is False
+
+        transformer._read_sidra_table.assert_called_once_with(transformer.BRONZE_FILES['pop_2010'])
+        transformer._write_silver_parquet.assert_not_called()
+        assert transformer.log_processing.call_args.args[1] == 'FAILED'
+
 
 class TestTransparencyTransformer:
     """Tests for TransparencyTransformer."""
 
-    @pytest.fixture
-    def mock_schema_config(self, tmp_path):
-        """Create a temporary schema config file."""
-        config = {
-            "version": "1.0.0",
-            "schemas": {
-                "compliance_sanctions": {
-                    "columns": {
-                        "sanction_id": {"type": "string"},
-                        "registry_type": {"type": "string"},
-                        "sanctioned_entity": {"type": "string"},
-                        "entity_type": {"type": "string"},
-                        "cpf_cnpj": {"type": "string"},
-                        "sanction_type": {"type": "string", "nullable": True}
-                    }
+    SCHEMA_CONFIG = {
+        "version": "1.0.0",
+        "schemas": {
+            "compliance_sanctions": {
+                "columns": {
+                    "sanction_id": {"type": "string"},
+                    "registry_type": {"type": "string"},
+                    "sanctioned_entity": {"type": "string"},
+                    "entity_type": {"type": "string"},
+                    "cpf_cnpj": {"type": "string"},
+                    "sanction_type": {"type": "string", "nullable": True}
                 }
-            },
-            "state_mapping": {"35": "São Paulo"},
-            "region_mapping": {"3": {"name": "Sudeste", "states": ["35"]}}
-        }
-        config_path = tmp_path / "test_schema.json"
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        return str(config_path)
+            }
+        },
+        "state_mapping": {"35": "São Paulo"},
+        "region_mapping": {"3": {"name": "Sudeste", "states": ["35"]}}
+    }
 
     def test_mask_document_cpf(self, mock_schema_config):
         """Test CPF masking."""
         from src.processing.transparency_transformer import TransparencyTransformer
         
-        with patch('boto3.client'):
-            transformer = TransparencyTransformer("test-bucket", mock_schema_config)
+        transformer = TransparencyTransformer("test-bucket", mock_schema_config)
         
         # Valid CPF - shows last 5 digits (indices 6-10)
         result = transformer._mask_document("12345678901", "CPF")
@@ -262,8 +489,7 @@ class TestTransparencyTransformer:
         """Test CNPJ masking."""
         from src.processing.transparency_transformer import TransparencyTransformer
         
-        with patch('boto3.client'):
-            transformer = TransparencyTransformer("test-bucket", mock_schema_config)
+        transformer = TransparencyTransformer("test-bucket", mock_schema_config)
         
         # Valid CNPJ - shows last 6 digits (indices 8-13)
         result = transformer._mask_document("12345678000199", "CNPJ")
@@ -273,25 +499,199 @@ class TestTransparencyTransformer:
         """Test entity type determination."""
         from src.processing.transparency_transformer import TransparencyTransformer
         
-        with patch('boto3.client'):
-            transformer = TransparencyTransformer("test-bucket", mock_schema_config)
+        transformer = TransparencyTransformer("test-bucket", mock_schema_config)
         
         assert transformer._determine_entity_type("12345678901") == "PF"
         assert transformer._determine_entity_type("12345678000199") == "PJ"
         assert transformer._determine_entity_type("123") == "UNKNOWN"
         assert transformer._determine_entity_type(None) == "UNKNOWN"
 
+    def test_classify_documents_matches_scalar(self, mock_schema_config):
+        """Test vectorized document classification agrees with the per-record helpers."""
+        from src.processing.transparency_transformer import TransparencyTransformer
+        
+        transformer = TransparencyTransformer("test-bucket", mock_schema_config)
+        
+        documents = pd.Series(["123.456.789-01", "12345678000199", "123456789", "123", "", None, 12345678901])
+        result = transformer._classify_documents(documents)
+        
+        expected_types = [transformer._determine_entity_type(d) for d in documents]
+        expected_masks = [
+            transformer._mask_document(d, 'CPF' if t == 'PF' else 'CNPJ')
+            for d, t in zip(documents, expected_types)
+        ]
+        assert result['entity_type'].tolist() == expected_types
+        assert result['cpf_cnpj'].tolist() == expected_masks
+
     def test_uf_to_state_code(self, mock_schema_config):
         """Test UF to state code conversion."""
         from src.processing.transparency_transformer import TransparencyTransformer
         
-        with patch('boto3.client'):
-            transformer = TransparencyTransformer("test-bucket", mock_schema_config)
+        transformer = TransparencyTransformer("test-bucket", mock_schema_config)
         
         assert transformer._uf_to_state_code("SP") == "35"
         assert transformer._uf_to_state_code("RJ") == "33"
         assert transformer._uf_to_state_code("sp") == "35"  # lowercase
         assert transformer._uf_to_state_code("XX") is None  # invalid
+        
+        ufs = pd.Series(["SP", " rj ", "35", "99", "XX", None])
+        assert transformer._uf_to_state_codes(ufs).tolist() == [
+            transformer._uf_to_state_code(uf) for uf in ufs
+        ]
+
+    def test_extract_nested_value(self, mock_schema_config):
+        """Test nested lookups by dotted path and by pre-split tuple."""
+        from src.processing.transparency_transformer import TransparencyTransformer
+
+        transformer = TransparencyTransformer("test-bucket", mock_schema_config)
+
+        record = {"orgao": {"nome": "CGU"}, "cpf": "12345678901"}
+        assert transformer._extract_nested_value(record, "orgao.nome") == "CGU"
+        assert transformer._extract_nested_value(record, ("orgao", "nome")) == "CGU"
+        assert transformer._extract_nested_value(record, ("cpf", "numero")) is None
+        assert transformer._extract_nested_value(record, None) is None
+
+    def test_sanction_ids_are_deterministic(self, mock_schema_config):
+        """Test sanction IDs use a stable document hash, not the salted builtin hash()."""
+        from src.processing.transparency_transformer import TransparencyTransformer
+
+        bronze = {
+            'bronze/transparency/ceis_compliance.json': [
+                {"sancionado": {"nome": "ACME"}, "cpfCnpjSancionado": "12.345.678/0001-90",
+                 "tipoSancao": "Inidoneidade", "orgaoSancionador": "CGU"},
+                {"sancionado": "Sem documento"},
+            ],
+        }
+
+        def run_once():
+            transformer = TransparencyTransformer("test-bucket", mock_schema_config)
+            written = {}
+            transformer.s3 = _fake_s3(bronze, written)
+            transformer.log_processing = MagicMock()
+            with patch.object(transformer, '_should_skip_processing', return_value=(False, 'test')):
+                assert transformer._transform_sanctions()
+            return pd.read_parquet(io.BytesIO(written['silver/fact_sanctions/data.parquet']))
+
+        first, second = run_once(), run_once()
+
+        doc_hash = zlib.crc32("12.345.678/0001-90".encode('utf-8')) % 10_000_000
+        assert sorted(first['sanction_id']) == sorted([f"CEIS_{doc_hash:07d}_00000", "CEIS_00000001"])
+        assert first['sanction_id'].tolist() == second['sanction_id'].tolist()
+
+    def test_sanctions_truncate_text_columns(self, mock_schema_config):
+        """Test free-text sanction columns are cut to their limits and blanks become null."""
+        from src.processing.transparency_transformer import TransparencyTransformer
+
+        transformer = TransparencyTransformer("test-bucket", mock_schema_config)
+        written = {}
+        transformer.s3 = _fake_s3({
+            'bronze/transparency/cepim_compliance.json': [
+                {"convenente": {"razaoSocial": "X" * 600}, "cnpjEntidade": "12345678000190",
+                 "motivoImpedimento": "", "orgaoConcedente": {"nome": "MEC"}},
+            ],
+        }, written)
+        transformer.log_processing = MagicMock()
+
+        with patch.object(transformer, '_should_skip_processing', return_value=(False, 'test')):
+            assert transformer._transform_sanctions()
+
+        df = pd.read_parquet(io.BytesIO(written['silver/fact_sanctions/data.parquet']))
+        assert len(df['sanctioned_entity'].iloc[0]) == 500
+        assert pd.isna(df['sanction_type'].iloc[0])
+        assert df['entity_type'].iloc[0] == 'PJ'
+
+    def test_sanctions_never_write_raw_document(self, write_schema_config):
+        """Test the unmasked document is dropped even without a sanctions schema to filter it."""
+        from src.processing.transparency_transformer import TransparencyTransformer
+
+        config_path = write_schema_config({"schemas": {}, "state_mapping": {}, "region_mapping": {}})
+
+        transformer = TransparencyTransformer("test-bucket", config_path)
+        written = {}
+        transformer.s3 = _fake_s3({
+            'bronze/transparency/ceis_compliance.json': [
+                {"sancionado": {"nome": "Ann"}, "cpfCnpjSancionado": "123.456.789-01"},
+            ],
+        }, written)
+        transformer.log_processing = MagicMock()
+
+        with patch.object(transformer, '_should_skip_processing', return_value=(False, 'test')):
+            assert transformer._transform_sanctions()
+
+        df = pd.read_parquet(io.BytesIO(written['silver/fact_sanctions/data.parquet']))
+        assert 'document' not in df.columns
+        assert df['cpf_cnpj'].tolist() == ['***.***789-01']
+        assert not df.isin(['123.456.789-01']).any().any()
+
+    def test_sanctions_skip_when_up_to_date(self, mock_schema_config):
+        """Test an up-to-date output short-circuits the sanctions transform."""
+        from src.processing.transparency_transformer import TransparencyTransformer
+
+        transformer = TransparencyTransformer("test-bucket", mock_schema_config)
+        transformer._read_bronze_files = MagicMock()
+
+        with patch.object(transformer, '_should_skip_processing', return_value=(True, 'unchanged')):
+            assert transformer._transform_sanctions()
+
+        transformer._read_bronze_files.assert_not_called()
+
+    def test_normalize_transfers(self, mock_schema_config):
+        """Test federal transfer field fallbacks and amount filtering."""
+        from src.processing.transparency_transformer import TransparencyTransformer
+
+        transformer = TransparencyTransformer("test-bucket", mock_schema_config)
+
+        data = [
+            {"valor": "1500,50", "tipoTransferencia": "FPM",
+             "orgaoSuperior": {"nome": "Ministério da Fazenda"},
+             "municipio": {"codigoIBGE": 3550308}},
+            {"valor": "", "valorRecebido": 200, "tipo": "Convênio", "orgaoSuperior": "MEC"},
+            {"valorTotal": "300", "unidadeGestora": {"nome": "FNDE"}},
+            {"descricao": "sem valor"},
+            # A zero amount counts as missing, like the old `or` chain
+            {"valor": 0, "valorRecebido": "75"},
+            {"valor": 0.0},
+        ]
+
+        df = transformer._normalize_transfers(data, 2015, 3)
+
+        assert len(df) == 6
+        assert pd.isna(df['transfer_amount'].iloc[3])
+        assert df['transfer_amount'].iloc[4] == 75.0
+        assert pd.isna(df['transfer_amount'].iloc[5])
+        df = df.iloc[:3]
+        assert df['transfer_amount'].tolist() == [1500.5, 200.0, 300.0]
+        assert df['transfer_type'].tolist() == ["FPM", "Convênio", "FEDERAL_TRANSFER"]
+        assert df['source_agency'].tolist() == ["Ministério da Fazenda", "MEC", "FNDE"]
+        assert df['municipality_code'].iloc[0] == "3550308"
+        assert df['municipality_code'].iloc[1:].isna().all()
+        assert (df['year'] == 2015).all() and (df['month'] == 3).all()
+        assert df['year'].dtype == 'int16' and df['month'].dtype == 'int8'
+
+    def test_list_federal_transfer_files_paginates(self, mock_schema_config):
+        """Test monthly file discovery reads every listing page."""
+        from src.processing.transparency_transformer import TransparencyTransformer
+
+        transformer = TransparencyTransformer("test-bucket", mock_schema_config)
+
+        prefix = 'bronze/transparency/'
+        pages = [
+            {'Contents': [{'Key': prefix + 'federal_transfers_2014_01.json'},
+                          {'Key': prefix + 'federal_transfers_2014_01.meta.json'}]},
+            {'Contents': [{'Key': prefix + 'federal_transfers_2013_12.json', 'ETag': '"etag1312"'}]},
+            {},
+        ]
+        transformer.s3 = MagicMock()
+        transformer.s3.get_paginator.return_value.paginate.return_value = pages
+
+        files = transformer._list_federal_transfer_files()
+
+        assert files == [prefix + 'federal_transfers_2013_12.json',
+                         prefix + 'federal_transfers_2014_01.json']
+        transformer.s3.get_paginator.assert_called_once_with('list_objects_v2')
+        # Listing ETags seed the bronze hash cache
+        assert transformer._get_bronze_file_hash(prefix + 'federal_transfers_2013_12.json') == 'etag1312'
+        transformer.s3.head_object.assert_not_called()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 import os
 import sys
-import json
 import logging
+import pytest
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -11,45 +11,36 @@ load_dotenv()
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.ingestion.ibge_client import IBGEIngestor
+from tests._ibge_probe import SESSION, build_probe_url, load_ibge_config, probe_all
+from tests._live_aws import aws_credentials_available, confirm_s3_ingestion, get_s3_client
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Live API/S3 checks: excluded from the default pytest run (see pytest.ini)
+pytestmark = pytest.mark.slow
+
 def test_api_connectivity():
     """Test basic IBGE SIDRA API connectivity without S3 upload."""
     logger.info("=" * 60)
     logger.info("BRONZE I - IBGE SIDRA API Connectivity Test")
     logger.info("=" * 60)
     
-    config_path = Path(__file__).parent.parent / "config" / "ibge_metadata.json"
-    
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    config = load_ibge_config()
     
     logger.info(f"✓ Loaded metadata: {len(config['datasets'])} datasets configured")
     
-    import requests
-    
     # Test with first dataset (pop_2010)
     test_dataset = config['datasets'][0]
     base_url = config['api_base_url']
     
-    table = test_dataset['table_id']
-    var = test_dataset.get('variable', 'allxp')
-    period = str(test_dataset['period']).replace(" ", "%20")
-    classif = test_dataset.get('classifications', '')
-    
-    # Use single municipality probe (Alta Floresta D'Oeste - RO)
-    url = f"{base_url}/t/{table}/n6/1100015/v/{var}/p/{period}"
-    if classif:
-        url += f"/{classif}"
-    url += "?formato=json"
+    url = build_probe_url(base_url, test_dataset)
     
     logger.info(f"\n🧪 Testing endpoint: {test_dataset['name']}")
     logger.info(f"   URL: {url}")
     
     try:
-        response = requests.get(url, timeout=30)
+        response = SESSION.get(url, timeout=30)
         logger.info(f"   Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -78,16 +69,16 @@ def test_s3_access():
     bucket_name = "enok-mba-thesis-datalake"
     
     try:
-        import boto3
-        s3 = boto3.client('s3')
+        s3 = get_s3_client()
         s3.head_bucket(Bucket=bucket_name)
         logger.info(f"✓ S3 bucket '{bucket_name}' is accessible")
         
-        # List existing Bronze I files
-        response = s3.list_objects_v2(Bucket=bucket_name, Prefix='bronze/ibge/')
+        # List existing Bronze I files (only the 3 we log; Delimiter keeps it to the top level)
+        response = s3.list_objects_v2(Bucket=bucket_name, Prefix='bronze/ibge/', MaxKeys=3, Delimiter='/')
         if 'Contents' in response:
-            logger.info(f"✓ Found {len(response['Contents'])} existing files in bronze/ibge/")
-            for obj in response['Contents'][:3]:
+            more = "+" if response.get('IsTruncated') else ""
+            logger.info(f"✓ Found {len(response['Contents'])}{more} existing files in bronze/ibge/")
+            for obj in response['Contents']:
                 logger.info(f"   - {obj['Key']} ({obj['Size']} bytes)")
         else:
             logger.info("ℹ️  No existing files in bronze/ibge/ (first run)")
@@ -100,16 +91,19 @@ def test_s3_access():
 
 def test_single_dataset_ingestion():
     """Test full ingestion flow for a single dataset."""
+    if not aws_credentials_available():
+        pytest.skip("no AWS credentials (aws sts get-caller-identity fails)")
+    
     logger.info("\n" + "=" * 60)
     logger.info("BRONZE I - Single Dataset Ingestion Test")
     logger.info("=" * 60)
     
     bucket_name = "enok-mba-thesis-datalake"
-    config_path = Path(__file__).parent.parent / "config" / "ibge_metadata.json"
     
     logger.info(f"Target S3 Bucket: {bucket_name}")
     
-    ingestor = IBGEIngestor(bucket_name, config_path)
+    # Shallow copy: the datasets swap below must not touch the cached config
+    ingestor = IBGEIngestor.from_dict(bucket_name, dict(load_ibge_config()))
     
     # Test with first dataset (pop_2010 - smallest/fastest)
     test_dataset_index = 0
@@ -142,52 +136,16 @@ def test_all_endpoints():
     logger.info("BRONZE I - All Endpoints Validation")
     logger.info("=" * 60)
     
-    config_path = Path(__file__).parent.parent / "config" / "ibge_metadata.json"
-    
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
-    
-    base_url = config['api_base_url']
+    probes = probe_all()
     results = []
     
-    import requests
-    
-    logger.info(f"\n{'Dataset':<30} | {'Status':<10} | {'Details'}")
-    logger.info("-" * 70)
-    
-    for ds in config['datasets']:
-        name = ds['name']
-        table = ds['table_id']
-        var = ds.get('variable', 'allxp')
-        period = str(ds['period']).replace(" ", "%20")
-        classif = ds.get('classifications', '')
-        
-        # Probe with single municipality
-        url = f"{base_url}/t/{table}/n6/1100015/v/{var}/p/{period}"
-        if classif:
-            url += f"/{classif}"
-        url += "?formato=json"
-        
-        try:
-            response = requests.get(url, timeout=20)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if isinstance(data, list) and len(data) > 1:
-                    status = "✅ PASS"
-                    details = f"{len(data)} records"
-                else:
-                    status = "⚠️ WARN"
-                    details = "Empty result"
-            else:
-                status = "❌ FAIL"
-                details = f"HTTP {response.status_code}"
-        except Exception as e:
-            status = "❌ FAIL"
-            details = str(e)[:30]
-        
-        logger.info(f"{name:<30} | {status:<10} | {details}")
-        results.append((name, status == "✅ PASS"))
+    # The whole table goes out as one log record
+    labels = {"PASS": "✅ PASS", "WARN": "⚠️ WARN", "FAIL": "❌ FAIL"}
+    rows = [f"\n{'Dataset':<30} | {'Status':<10} | {'Details'}", "-" * 70]
+    for name, status, details in probes:
+        rows.append(f"{name:<30} | {labels[status]:<10} | {details[:30] if status == 'FAIL' else details}")
+        results.append((name, status == "PASS"))
+    logger.info("\n".join(rows))
     
     passed = sum(1 for _, success in results if success)
     logger.info("-" * 70)
@@ -224,8 +182,7 @@ def main():
     
     # Test 4: Single Dataset Ingestion
     if results['api_connectivity'] and results['s3_access']:
-        user_input = input("\n⚠️  Proceed with S3 ingestion test? This will upload data. (yes/no): ")
-        if user_input.lower() in ['yes', 'y']:
+        if confirm_s3_ingestion():
             results['ingestion'] = test_single_dataset_ingestion()
         else:
             logger.info("Skipping S3 ingestion test.")
@@ -1,64 +1,35 @@
+import sys
 import json
-import requests
 import logging
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests._ibge_probe import probe_all
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
-def test_ibge_metadata_urls(config_path="config/ibge_metadata.json"):
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
-
-    base_url = config['api_base_url']
-    results = []
-
-    # Test probe: Requesting only 1 municipality to save time/bandwidth
-    # Code 1100015 = Alta Floresta D'Oeste - RO
-    geo_probe = "n6/1100015"
+# Live API/S3 checks: excluded from the default pytest run (see pytest.ini)
+pytestmark = pytest.mark.slow
 
-    print(f"{'Dataset Name':<30} | {'Status':<10} | {'Reason'}")
-    print("-" * 60)
+def test_ibge_metadata_urls(config_path=None):
+    # Default to the project config's precomputed probe URLs; an explicit path is read as given
+    probes = probe_all() if config_path is None else probe_all(json.loads(Path(config_path).read_bytes()))
 
-    for ds in config['datasets']:
-        name = ds['name']
-        table = ds['table_id']
-        var = ds.get('variable', 'allxp')
-        period = str(ds['period']).replace(" ", "%20")
-        classif = ds.get('classifications', '')
-
-        # Constructing the probe URL
-        url = f"{base_url}/t/{table}/{geo_probe}/v/{var}/p/{period}"
-        if classif:
-            url += f"/{classif}"
-        url += "?formato=json"
-
-        try:
-            # Short timeout since we are only fetching 1 row
-            response = requests.get(url, timeout=15)
-
-            if response.status_code == 200:
-                data = response.json()
-                # Sidra returns a list; index 0 is header, index 1 is the data
-                if isinstance(data, list) and len(data) > 1:
-                    status = "PASS"
-                    reason = "Valid Data Found"
-                else:
-                    status = "WARN"
-                    reason = "Empty Result (Check Period/Variable)"
-            else:
-                status = "FAIL"
-                reason = f"HTTP {response.status_code}"
-
-        except Exception as e:
-            status = "FAIL"
-            reason = str(e)
+    results = []
 
-        print(f"{name:<30} | {status:<10} | {reason}")
+    # The whole table is written in one call
+    rows = [f"{'Dataset Name':<30} | {'Status':<10} | {'Reason'}", "-" * 60]
+    for name, status, reason in probes:
+        rows.append(f"{name:<30} | {status:<10} | {reason}")
         results.append((name, status == "PASS"))
+    print("\n".join(rows))
 
     return results
 
 if __name__ == "__main__":
     # Ensure this points to your actual JSON file
-    test_ibge_metadata_urls("config/ibge_metadata.json")
\ No newline at end of file
+    test_ibge_metadata_urls("config/ibge_metadata.json")
@@ -2,8 +2,13 @@ import os
 import sys
 import json
 import logging
+import functools
+import pytest
+import requests
 from pathlib import Path
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment variables from .env file
 load_dotenv()
@@ -11,10 +16,28 @@ load_dotenv()
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.ingestion.transparency_client import TransparencyIngestor
+from tests._live_aws import aws_credentials_available, confirm_s3_ingestion, get_s3_client
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Live API/S3 checks: excluded from the default pytest run (see pytest.ini)
+pytestmark = pytest.mark.slow
+
+TRANSPARENCY_CONFIG_PATH = Path(__file__).parent.parent / "config" / "transparency_metadata.json"
+
+# Rate-limited (429) calls back off exponentially (honouring Retry-After) instead of failing outright
+RATE_LIMIT_RETRIES = 5
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    max_retries=Retry(total=RATE_LIMIT_RETRIES, backoff_factor=1, status_forcelist=[429], raise_on_status=False)
+))
+
+@functools.lru_cache(maxsize=1)
+def load_transparency_config():
+    """Parse transparency_metadata.json once per process (callers must not mutate the result)."""
+    return json.loads(TRANSPARENCY_CONFIG_PATH.read_bytes())
+
 def test_api_connectivity():
     """Test basic API connectivity without S3 upload."""
     logger.info("=" * 60)
@@ -29,17 +52,12 @@ def test_api_connectivity():
     
     logger.info(f"✓ API Key found: {api_key[:10]}...{api_key[-4:]}")
     
-    config_path = Path(__file__).parent.parent / "config" / "transparency_metadata.json"
-    
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    config = load_transparency_config()
     
     logger.info(f"✓ Loaded metadata: {len(config['datasets'])} datasets configured")
     logger.info(f"  - Rate limit: {config['rate_limit']['delay_between_requests']}s between requests")
     logger.info(f"  - Max pages: {config['pagination']['max_pages']}")
     
-    import requests
-    
     test_dataset = config['datasets'][5]
     base_url = config['api_base_url']
     url = f"{base_url}{test_dataset['endpoint']}"
@@ -50,7 +68,7 @@ def test_api_connectivity():
     
     try:
         headers = {"chave-api-dados": api_key}
-        response = requests.get(url, params=test_dataset['params'], headers=headers, timeout=30)
+        response = SESSION.get(url, params=test_dataset['params'], headers=headers, timeout=30)
         
         logger.info(f"   Status Code: {response.status_code}")
         
@@ -61,7 +79,7 @@ def test_api_connectivity():
                 logger.info(f"   Sample keys: {list(data[0].keys())[:5]}")
             return True
         elif response.status_code == 429:
-            logger.error(f"   ❌ RATE LIMIT HIT (429). Wait before retrying.")
+            logger.error(f"   ❌ RATE LIMIT HIT (429) after {RATE_LIMIT_RETRIES} retries. Wait before retrying.")
             return False
         else:
             logger.error(f"   ❌ FAILED: {response.text[:200]}")
@@ -73,18 +91,19 @@ def test_api_connectivity():
 
 def test_single_dataset_ingestion():
     """Test full ingestion flow for a single small dataset."""
+    if not aws_credentials_available():
+        pytest.skip("no AWS credentials (aws sts get-caller-identity fails)")
+    
     logger.info("\n" + "=" * 60)
     logger.info("BRONZE II - Single Dataset Ingestion Test")
     logger.info("=" * 60)
     
     bucket_name = os.getenv("S3_BUCKET_NAME", "enok-mba-thesis-datalake")
-    config_path = Path(__file__).parent.parent / "config" / "transparency_metadata.json"
     
     logger.info(f"Target S3 Bucket: {bucket_name}")
     
     try:
-        import boto3
-        s3 = boto3.client('s3')
+        s3 = get_s3_client()
         s3.head_bucket(Bucket=bucket_name)
         logger.info(f"✓ S3 bucket '{bucket_name}' is accessible")
     except Exception as e:
@@ -92,7 +111,7 @@ def test_single_dataset_ingestion():
         logger.info("   Verify AWS credentials with: aws s3 ls")
         return False
     
-    ingestor = TransparencyIngestor(bucket_name, config_path)
+    ingestor = TransparencyIngestor(bucket_name, TRANSPARENCY_CONFIG_PATH)
     
     test_dataset_index = 5
     test_ds = ingestor.config['datasets'][test_dataset_index]
@@ -133,9 +152,11 @@ def main():
     
     results['connectivity'] = test_api_connectivity()
     
-    if results['connectivity']:
-        user_input = input("\n⚠️  Proceed with S3 ingestion test? This will upload data. (yes/no): ")
-        if user_input.lower() in ['yes', 'y']:
+    if results['connectivity'] and not aws_credentials_available():
+        logger.warning("Skipping ingestion test: no AWS credentials (aws sts get-caller-identity fails).")
+        results['ingestion'] = None
+    elif results['connectivity']:
+        if confirm_s3_ingestion():
             results['ingestion'] = test_single_dataset_ingestion()
         else:
             logger.info("Skipping S3 ingestion test.")